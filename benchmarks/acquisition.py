@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       End-to-end acquisition benchmarks of the High Voltage Client against the simulated devices
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import sys
+from argparse import ArgumentParser
+from collections import OrderedDict
+from configparser import ConfigParser
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from io import StringIO
+from json import dump, load
+from os import remove, getpid
+from os.path import join, dirname, realpath, exists
+from platform import python_version
+from shutil import rmtree
+from subprocess import run, PIPE
+from tempfile import mkdtemp
+from time import time, sleep, perf_counter
+from warnings import catch_warnings, simplefilter
+
+Dir = dirname(dirname(realpath(__file__)))
+sys.path.insert(0, dirname(Dir))  # run as script from a checkout named HVClient
+
+from numpy import array, percentile
+from HVClient.devices import simulator
+from HVClient.devices.device import Device
+from HVClient.src.config import Config
+from HVClient.src.device_reader import get_driver
+from HVClient.src.log_writer import LogWriter
+from HVClient.src.logger import Logger
+from HVClient.src.utils import ON, OFF
+
+Sections = ['acquisition', 'logging', 'replay']
+
+# device section of the config per model, address and data directory are filled in
+DeviceConfig = OrderedDict([
+    ('NHS-6220x', {'name': 'ISEG-NHS-6220x', 'module_name': 'ISEG', 'number of channels': 6, 'active channels': [0, 1], 'dut name': '[A, B, None, None, None, None]',
+                   'compliance': 100e-6, 'maximum bias': [200] * 6, 'target bias': [0] * 6, 'measure_range': 10e-6, 'ramping speed': 10}),
+    ('2410', {'name': 'Keithley2410', 'dut name': 'D0', 'compliance': 100e-6, 'ramping speed': 1000, 'maximum step': 1000, 'target bias': 0, 'maximum bias': 1000,
+              'baudrate': 57600, 'output': 'rear', 'active channels': [0]}),
+    ('237', {'name': 'Keithley237', 'dut name': 'D0', 'gbip': 1, 'ramping speed': 1000, 'maximum step': 1000, 'target bias': 0, 'maximum bias': 1100,
+             'n_average_filter': 32, 'integration_time': 3, 'compliance': 1e-6, 'measure_range': 1e-7, 'active channels': [0]}),
+    ('6517B', {'name': 'Keithley6517', 'dut name': 'D0', 'compliance': 100e-6, 'ramping speed': 1000, 'maximum step': 1000, 'target bias': 0, 'maximum bias': 1000,
+               'output': 'front', 'active channels': [0]}),
+])
+
+
+@contextmanager
+def quiet(verbose=False):
+    """Swallow the console output and the warnings of the drivers and loggers."""
+    if verbose:
+        yield
+    else:
+        with redirect_stdout(StringIO()), catch_warnings():
+            simplefilter('ignore')
+            yield
+
+
+def get_version():
+    p = run(['git', 'describe', '--always', '--dirty'], cwd=Dir, stdout=PIPE, stderr=PIPE, universal_newlines=True)
+    return p.stdout.strip() if not p.returncode else None
+
+
+def get_stats(values):
+    """:returns: number, mean, median, 99% quantile and maximum of the [values] (in s)."""
+    values = array(values, dtype=float)
+    if not values.size:
+        return {'n': 0}
+    return {'n': int(values.size), 'mean': float(values.mean()), 'median': float(percentile(values, 50)), 'p99': float(percentile(values, 99)), 'max': float(values.max())}
+
+
+class BenchmarkConfig:
+    """ Temporary config file in the config directory (the devices only load configs from there) which points the devices to the simulators. """
+
+    def __init__(self, data_dir, engine='thread', poll_period=.1, buffered=False):
+        self.Name = 'benchmark_{}'.format(getpid())
+        self.FileName = join(Dir, 'config', '{}.ini'.format(self.Name))
+        self.Parser = ConfigParser()
+        self.Parser['Data'] = {'directory': data_dir}
+        self.Parser['Devices'] = {'active': [], 'engine': engine, 'parallel startup': False}
+        self.PollPeriod = poll_period
+        self.Buffered = buffered
+
+    def add_device(self, nr, model, address):
+        options = dict(DeviceConfig[model], model=model, address=address)
+        options['poll period'] = self.PollPeriod
+        options['buffered'] = self.Buffered
+        self.Parser['HV{}'.format(nr)] = {key: str(value) for key, value in options.items()}
+
+    def set(self, section, option, value):
+        self.Parser[section][option] = str(value)
+
+    def write(self):
+        with open(self.FileName, 'w') as f:
+            self.Parser.write(f)
+        return Config(self.Name)
+
+    def remove(self):
+        if exists(self.FileName):
+            remove(self.FileName)
+
+
+# ----------------------------------------
+# region ACQUISITION
+class SetpointProbe:
+    """ Records the times at which the set voltage of the simulated channels changes, i.e. when a command reached the instrument. """
+
+    def __init__(self, instrument):
+        self.Instrument = instrument
+        self.Handle = instrument.handle
+        self.Changes = []  # (perf_counter, channel, set voltage)
+        instrument.handle = self.handle
+
+    def handle(self, line):
+        before = [c.SetVoltage for c in self.Instrument.Channels]
+        answers = self.Handle(line)
+        t = perf_counter()
+        for ch, (v, c) in enumerate(zip(before, self.Instrument.Channels)):
+            if c.SetVoltage != v:
+                self.Changes.append((t, ch, c.SetVoltage))
+        return answers
+
+    def wait(self, t0, channel, timeout=5.):
+        """:returns: time of the first change of the set voltage of the [channel] after [t0] (None after [timeout] seconds)."""
+        while perf_counter() - t0 < timeout:
+            t = next((t for t, ch, _ in list(self.Changes) if ch == channel and t > t0), None)
+            if t is not None:
+                return t
+            sleep(.0005)
+
+
+def start_devices(config, models, latency, jitter, baudrate):
+    """:returns: the simulator endpoints and the devices polling them."""
+    endpoints, devices = [], []
+    for nr, model in enumerate(models):
+        endpoints.append(simulator.start(model, latency=latency, jitter=jitter, baudrate=baudrate))
+        config.add_device(nr, model, endpoints[-1].Port)
+    config.set('Devices', 'active', list(range(len(models))))
+    c = config.write()
+    for nr, model in enumerate(models):
+        devices.append(get_driver(model)(nr, c.MainFile, True))
+    return endpoints, devices
+
+
+def stop_devices(endpoints, devices):
+    for dev in devices:
+        dev.IsKilled = True
+    for dev in devices:
+        if dev.is_alive():
+            dev.join(10 * dev.get_poll_period() + 1)
+        elif dev.Engine is not None:
+            dev.Engine.wait(dev, 10 * dev.get_poll_period() + 1)
+        for logger in dev.Logger:
+            logger.close()
+        if getattr(dev, 'serial', None) is not None:
+            dev.serial.close()
+    for endpoint in endpoints:
+        endpoint.close()
+
+
+def count_samples(dev):
+    """Count the readings of the [dev] by wrapping its fill methods. :returns: list with the number of readings"""
+    n = [0]
+
+    def fill_iv_now(data, fill=dev.fill_iv_now):
+        n[0] += 1
+        fill(data)
+
+    def add_samples(data, channel=0, add=dev.add_samples):
+        n[0] += data.size
+        add(data, channel)
+    dev.fill_iv_now, dev.add_samples = fill_iv_now, add_samples
+    return n
+
+
+def measure_latency(dev, probe, n, biases=(-12., -10.)):
+    """:returns: times from set_target_bias until the new set voltage reached the simulated instrument (the channels start at -10 V)."""
+    latencies = []
+    for i in range(n):
+        for ch in dev.ActiveChannels:
+            bias = biases[i % 2]
+            t0 = perf_counter()
+            dev.set_target_bias(bias, ch)
+            t = probe.wait(t0, ch)
+            if t is not None:
+                latencies.append(t - t0)
+            deadline = time() + 10
+            while (dev.is_ramping(ch) or probe.Instrument.Channels[ch].is_ramping) and time() < deadline:  # next step only from a settled channel
+                sleep(.001)
+    return latencies
+
+
+def bench_acquisition(args, engine, data_dir):
+    """:returns: poll cycle statistics, samples per second and channel and the command latency of all devices polled by the [engine]."""
+    config = BenchmarkConfig(join(data_dir, 'acquisition_{}'.format(engine)), engine, args.poll_period, args.buffered)
+    results = OrderedDict()
+    try:
+        with quiet(args.verbose):
+            endpoints, devices = start_devices(config, args.models, args.latency, args.jitter, args.baudrate)
+            probes = [SetpointProbe(e.Instrument) for e in endpoints]
+            counters = [count_samples(dev) for dev in devices]
+            for dev in devices:
+                for ch in dev.ActiveChannels:
+                    dev.set_output(ON, ch)
+                    dev.set_target_bias(-10., ch)
+                dev.start()
+            sleep(1)  # settle and ramp to the first set point
+            for dev, n in zip(devices, counters):
+                dev.Scheduler.reset()
+                n[0] = 0
+            t = perf_counter()
+            sleep(args.duration)
+            duration = perf_counter() - t
+            for dev, n in zip(devices, counters):
+                results[dev.Config.Section] = OrderedDict([('model', dev.Config.get_value('model')), ('samples/s', n[0] / duration), ('poll', dev.get_poll_stats()),
+                                                           ('queries', dev.get_latency_stats()), ('lock', dev.get_lock_stats())])
+            for dev, probe in zip(devices, probes):
+                results[dev.Config.Section]['command latency'] = get_stats(measure_latency(dev, probe, args.repeat))
+            for dev in devices:
+                for ch in dev.ActiveChannels:
+                    dev.set_output(OFF, ch)
+            stop_devices(endpoints, devices)
+    finally:
+        config.remove()
+    return results
+# endregion ACQUISITION
+# ----------------------------------------
+
+
+# ----------------------------------------
+# region LOGGING
+def make_logger(config, section, directory, binary=False, rollup=False, on=True):
+    config.set('Data', 'directory', directory)
+    config.set('Data', 'binary', binary)
+    config.set('Data', 'rollup', rollup)
+    c = config.write()
+    c.set_section(section)
+    return Logger(0, c, on)
+
+
+def bench_logging(args, data_dir):
+    """:returns: entries per second which Logger.write_log sustains for the text, binary and rollup logs and with the log writer thread."""
+    config = BenchmarkConfig(data_dir)
+    config.add_device(0, '2410', '/dev/null')
+    results = OrderedDict()
+    try:
+        for mode, binary, rollup, writer in [('text', False, False, False), ('binary', True, False, False), ('rollup', True, True, False), ('async', True, True, True)]:
+            with quiet(args.verbose):
+                logger = make_logger(config, 'HV0', join(data_dir, 'logging_{}'.format(mode)), binary, rollup)
+                if writer:
+                    logger.Writer = LogWriter(queue_size=args.entries + 1)
+                    logger.Writer.start()
+                t0, t = time(), perf_counter()
+                for i in range(args.entries):
+                    logger.write_log(True, -100. + (i % 10) * .01, 1e-9 * (1 + (i % 7) * .01), False, -100., t=t0 + i * .01)
+                call = perf_counter() - t
+                if writer:
+                    logger.Writer.stop()
+                total = perf_counter() - t
+                logger.close()
+            results[mode] = {'entries': args.entries, 'entries/s': args.entries / total, 'call': call / args.entries, 'total': total}
+    finally:
+        config.remove()
+    return results
+# endregion LOGGING
+# ----------------------------------------
+
+
+# ----------------------------------------
+# region REPLAY
+def write_history(logger, start, end, rate):
+    """Fill the logs of the [logger] with measurements at [rate] Hz from [start] to [end] (epoch times), one file per day like the acquisition."""
+    logger.Day = datetime.fromtimestamp(start).strftime('%d')
+    logger.configure(start)
+    n = int((end - start) * rate)
+    for i in range(n):
+        logger.write_log(True, -100. + (i % 10) * .01, 1e-9 * (1 + (i % 7) * .01), False, -100., t=start + i / rate)
+    logger.close()
+    return n
+
+
+def bench_replay(args, data_dir):
+    """:returns: time to read the measurements of the last day and week with get_data_from_logs from the text, binary and rollup logs."""
+    config = BenchmarkConfig(join(data_dir, 'replay'))
+    config.add_device(0, '2410', '/dev/null')
+    results = OrderedDict()
+    end = time()
+    try:
+        with quiet(args.verbose):
+            t = perf_counter()
+            n = write_history(make_logger(config, 'HV0', join(data_dir, 'replay'), True, True, on=False), end - max(args.days) * 86400, end, args.rate)
+            results['generated'] = {'entries': n, 'time': perf_counter() - t}
+            dev = Device(0, config.write().MainFile, hot_start=True, init_logger=False)
+        display_points = dev.DisplayPoints
+        for days in args.days:
+            dev.StartTime = datetime.fromtimestamp(end - days * 86400)
+            for mode, binary, points in [('text', False, 1e9), ('binary', True, 1e9), ('rollup', True, display_points)]:
+                dev.Logger[0].Binary, dev.DisplayPoints = binary, points  # huge number of display points: no rollup level has enough buckets
+                times = []
+                for _ in range(args.repeat):
+                    t = perf_counter()
+                    data = dev.get_data_from_logs(0)
+                    times.append(perf_counter() - t)
+                results['{}d {}'.format(days, mode)] = {'days': days, 'mode': mode, 'points': int(data.size), 'time': min(times), 'entries/s': days * 86400 * args.rate / min(times)}
+    finally:
+        config.remove()
+    return results
+# endregion REPLAY
+# ----------------------------------------
+
+
+def flatten(dic, prefix=''):
+    """:returns: dictionary of the numeric leaves of the nested [dic] with the keys joined by '/'."""
+    items = OrderedDict()
+    for key, value in dic.items():
+        if isinstance(value, dict):
+            items.update(flatten(value, '{}{}/'.format(prefix, key)))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items['{}{}'.format(prefix, key)] = value
+    return items
+
+
+def compare(results, file_name, threshold):
+    """Print the numbers which changed by more than [threshold] (relative) with respect to an earlier result file."""
+    with open(file_name) as f:
+        data = load(f)
+    old, new = flatten(data['results']), flatten(results)
+    print('\n======== CHANGES > {:.0%} vs {} ========'.format(threshold, data.get('version') or file_name))
+    for key in new:
+        if key in old and old[key] and abs(new[key] / old[key] - 1) > threshold:
+            print('{:<60} {:12.4g} -> {:12.4g} ({:+.0%})'.format(key, old[key], new[key], new[key] / old[key] - 1))
+
+
+def print_results(results):
+    for engine, devices in results.get('acquisition', {}).items():
+        for section, r in devices.items():
+            p, lat = r['poll'], r['command latency']
+            print('{:<8} {:<4} {:<10} {:7.1f} samples/s, cycle {:6.1f} ms (busy {:5.1f} ms, jitter {:5.2f} ms, {} overruns), set bias -> wire {}'.format(
+                engine, section, r['model'], r['samples/s'], 1000 * p['period'], 1000 * p['busy'], 1000 * p['jitter'], p['overruns'],
+                '{:6.1f} ms (p99 {:6.1f} ms)'.format(1000 * lat['median'], 1000 * lat['p99']) if lat['n'] else 'n/a'))
+    for mode, r in results.get('logging', {}).items():
+        print('logging  {:<8} {:10.0f} entries/s ({:5.1f} us per call)'.format(mode, r['entries/s'], 1e6 * r['call']))
+    for key, r in results.get('replay', {}).items():
+        if key == 'generated':
+            print('replay   generated {} entries in {:.1f} s'.format(r['entries'], r['time']))
+        else:
+            print('replay   {:<10} {:8.1f} ms, {:8d} points ({:.2e} entries/s)'.format(key, 1000 * r['time'], r['points'], r['entries/s']))
+
+
+def main():
+    parser = ArgumentParser(description='end-to-end benchmarks of the acquisition, logging and log replay with simulated devices')
+    parser.add_argument('sections', nargs='*', default=Sections, help=f'benchmarks: {", ".join(Sections)}')
+    parser.add_argument('--models', '-m', nargs='+', default=list(DeviceConfig), help=f'simulated devices: {", ".join(DeviceConfig)}')
+    parser.add_argument('--engine', '-e', nargs='+', default=['thread', 'async'], help='poll engines to compare')
+    parser.add_argument('--duration', '-d', type=float, default=5, help='acquisition time per engine in s')
+    parser.add_argument('--poll-period', type=float, default=.1, help='poll period of the devices in s')
+    parser.add_argument('--buffered', action='store_true', help='buffered acquisition of the Keithley 24XX')
+    parser.add_argument('--latency', type=float, default=.005, help='mean response time of the simulators in s')
+    parser.add_argument('--jitter', type=float, default=.001, help='standard deviation of the response time in s')
+    parser.add_argument('--baudrate', type=int, default=57600, help='simulated transmission rate, 0 = instant')
+    parser.add_argument('--entries', '-n', type=int, default=100000, help='number of log entries per logging benchmark')
+    parser.add_argument('--days', nargs='+', type=float, default=[1, 7], help='time windows of the log replay in days')
+    parser.add_argument('--rate', type=float, default=1, help='measurements per second in the replayed logs')
+    parser.add_argument('--repeat', '-r', type=int, default=10, help='number of set bias commands per channel and of replays (the fastest is reported)')
+    parser.add_argument('--json', '-j', help='write the results to this file')
+    parser.add_argument('--compare', '-c', help='result file of an earlier version to compare with')
+    parser.add_argument('--threshold', type=float, default=.1, help='relative change which is reported by --compare')
+    parser.add_argument('--keep', action='store_true', help='keep the generated data')
+    parser.add_argument('--verbose', '-v', action='store_true', help='show the output of the drivers')
+    args = parser.parse_args()
+
+    data_dir = mkdtemp(prefix='hv_benchmark_')
+    results = OrderedDict()
+    try:
+        if 'acquisition' in args.sections:
+            results['acquisition'] = OrderedDict((engine, bench_acquisition(args, engine, data_dir)) for engine in args.engine)
+        if 'logging' in args.sections:
+            results['logging'] = bench_logging(args, data_dir)
+        if 'replay' in args.sections:
+            results['replay'] = bench_replay(args, data_dir)
+    finally:
+        if not args.keep:
+            rmtree(data_dir, ignore_errors=True)
+    print_results(results)
+    if args.compare:
+        compare(results, args.compare, args.threshold)
+    if args.json:
+        with open(args.json, 'w') as f:
+            dump({'version': get_version(), 'python': python_version(), 'time': datetime.now().isoformat(), 'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Import time of the entry points of the High Voltage Client (python -X importtime)
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from json import dump
+from os import environ, pathsep
+from os.path import dirname, realpath
+from subprocess import run, PIPE
+from sys import executable
+from time import perf_counter
+
+Dir = dirname(dirname(realpath(__file__)))
+
+# entry point -> module which it imports first
+EntryPoints = OrderedDict([('cli', 'HVClient.src.device_reader'),
+                           ('gui', 'HVClient.src.gui'),
+                           ('ISEG', 'HVClient.devices.ISEG'),
+                           ('Keithley24XX', 'HVClient.devices.Keithley24XX'),
+                           ('Keithley23X', 'HVClient.devices.Keithley23X'),
+                           ('Keithley2657', 'HVClient.devices.Keithley2657'),
+                           ('Keithley6517B', 'HVClient.devices.Keithley6517B')])
+
+
+def import_time(module):
+    """:returns: wall time of the interpreter and the parsed -X importtime output (own import time in s per module)."""
+    env = dict(environ, PYTHONPATH=pathsep.join([dirname(Dir)] + ([environ['PYTHONPATH']] if 'PYTHONPATH' in environ else [])))
+    t = perf_counter()
+    p = run([executable, '-X', 'importtime', '-c', f'import {module}'], stdout=PIPE, stderr=PIPE, env=env, universal_newlines=True)
+    wall = perf_counter() - t
+    if p.returncode:
+        return wall, None, p.stderr.strip().split('\n')[-1]
+    modules = OrderedDict()
+    for line in p.stderr.split('\n'):
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            own, _, name = line[12:].split('|')
+            modules[name.strip()] = int(own) / 1e6
+    return wall, modules, None
+
+
+def main():
+    parser = ArgumentParser(description='import time of the entry points')
+    parser.add_argument('entry', nargs='*', default=list(EntryPoints), help=f'entry points: {", ".join(EntryPoints)} or module names')
+    parser.add_argument('--repeat', '-n', type=int, default=3, help='number of runs, the fastest is reported')
+    parser.add_argument('--top', '-t', type=int, default=5, help='number of the slowest modules to show')
+    parser.add_argument('--json', '-j', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = OrderedDict()
+    for entry in args.entry:
+        module = EntryPoints.get(entry, entry)
+        runs = [import_time(module) for _ in range(args.repeat)]
+        wall, modules, err = min(runs, key=lambda r: r[0])
+        if err is not None:
+            print(f'{entry:<14} failed: {err}')
+            results[entry] = {'module': module, 'error': err}
+            continue
+        top = sorted(modules.items(), key=lambda i: -i[1])[:args.top]
+        results[entry] = {'module': module, 'wall': wall, 'import': sum(modules.values()), 'top': OrderedDict(top)}
+        print(f'{entry:<14} wall {1000 * wall:7.1f} ms, import {1000 * sum(modules.values()):7.1f} ms: {", ".join(f"{n} {1000 * v:.0f}" for n, v in top)}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
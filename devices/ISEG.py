@@ -4,19 +4,26 @@
 import warnings
 from serial import Serial, PARITY_NONE, STOPBITS_ONE, EIGHTBITS, SerialException
 from HVClient.devices.device import *
+from HVClient.devices.transport import LineTransport
+from HVClient.devices.timing import CommandTiming
+from time import perf_counter
 from typing import Any
 
 
 class ISEG(Device):
+
+    AsyncPoll = True
+
+    PollCommands = [':READ:CHAN:CONT?{}', ':READ:CHAN:STAT?{}', ':MEAS:VOLT?{}', ':MEAS:CURR?{}']
+    MaxPollFailures = 3  # number of invalid answers in a row after which the combined query is not used anymore
+
     def __init__(self, device_no, config='main', hot_start=True, print_logs=False):
 
         Device.__init__(self, device_no, config, hot_start, print_logs)
 
         # Basics
         self.CommandEndCharacter = '\r\n'
-        self.ReadSleepTime = .1
-        self.WriteSleepTime = .1
-        self.AnswerTime = .1
+        self.Timing = CommandTiming(self.ModelNumber)
         self.MaxVoltage = None
 
         self.Identifier = None
@@ -26,10 +33,10 @@ class ISEG(Device):
         self.bOpen = False
         self.SerialPortName = self.Config.get_value('address')
         self.Serial = None
+        self.bOpenInformed = False
         self.open_serial_port()
 
         # Info
-        self.Busy = False
         self.last_write = ''
         self.LastMeasurement = -1
         self.LastCurrents = []
@@ -38,6 +45,8 @@ class ISEG(Device):
         self.LastStatus = []
         self.lastVoltage = 0
         self.CanRamp = True
+        self.NPollFailures = 0
+        self.NStatusRetries = 0
 
         self.init_device(hot_start)
         self.hot_start()
@@ -47,6 +56,7 @@ class ISEG(Device):
     def open_serial_port(self):
         try:
             self.Serial = Serial(port=self.SerialPortName, baudrate=9600, parity=PARITY_NONE, stopbits=STOPBITS_ONE, bytesize=EIGHTBITS, timeout=.5, )
+            self.Transport = LineTransport(self.Serial, self.CommandEndCharacter, self.ReadTimeout)
             self.bOpen = True
             info('Open serial port: {}'.format(self.SerialPortName))
         except SerialException:
@@ -137,7 +147,8 @@ class ISEG(Device):
         info('Set ramp speed to {}'.format(speed))
         self.configure_ramp_speed('VOLT', speed)
 
-    def set_ramp_speed(self, speed):
+    def set_ramp_speed(self, speed, channel=None):
+        """The ramp speed is a setting of the module, [channel] is only accepted for the common interface of the devices."""
         self.configure_ramp_speed_voltage(speed)
 
     def configure_ramp_speed_current(self, speed=None):
@@ -188,114 +199,128 @@ class ISEG(Device):
             self.LastMeasurement = now
         return [{'voltage': v, 'current': c} for v, c in zip(self.LastVoltages, self.LastCurrents)]
 
+    def make_poll_query(self):
+        return ';'.join(cmd.format(self.make_channel_string(ALL)) for cmd in ISEG.PollCommands)
+
+    def query_all(self):
+        """:returns: control word, status word, voltage and current of all channels, read with one semicolon-chained query."""
+        return self.parse_poll(self.get_answer_for_query(self.make_poll_query()))
+
+    def parse_poll(self, answer):
+        words = [part.split() for part in answer.split(';')]
+        if len(words) != len(ISEG.PollCommands) or any(len(w) != len(words[0]) for w in words) or len(words[0]) <= max(self.ActiveChannels):
+            raise ValueError('Invalid answer to the combined query: "{}"'.format(answer))
+        control, status = [[int(w) for w in part] for part in words[:2]]
+        voltage, current = [[float(w.rstrip('VA')) for w in part] for part in words[2:]]
+        return control, status, voltage, current
+
+    def update_iv(self):
+        """Update status, voltage and current of all channels in a single round trip (falls back to the single queries if the answer is invalid)."""
+        if self.NPollFailures >= ISEG.MaxPollFailures:
+            return Device.update_iv(self)
+        try:
+            control, status, voltages, currents = self.query_all()
+            self.NPollFailures = 0
+        except Exception as err:
+            self.NPollFailures += 1
+            warning('Combined query failed{}: {}'.format(', using single queries from now on' if self.NPollFailures == ISEG.MaxPollFailures else '', err))
+            self.clear_buffer(warning=False)
+            return Device.update_iv(self)
+        self.apply_poll(control, status, voltages, currents)
+
+    async def async_update_iv(self):
+        try:
+            values = self.parse_poll(await self.async_query(self.make_poll_query()))
+            self.NPollFailures = 0
+        except ValueError:
+            self.NPollFailures += 1
+            raise
+        self.apply_poll(*values)
+
+    def uses_async_poll(self):
+        return self.NPollFailures < ISEG.MaxPollFailures
+
+    def is_echo(self, line):
+        return line.startswith('*') or line.startswith(':')
+
+    def apply_poll(self, control, status, voltages, currents):
+        now = time()
+        self.LastStatus = [self.convert_channel_status(word) for word in status]
+        self.LastStatusUpdate = now
+        for channel in self.ActiveChannels:
+            self.set_status(channel, self.convert_channel_control(control[channel])['SetOn'])
+        if any(self.Status):
+            self.LastVoltages, self.LastCurrents, self.LastMeasurement = voltages, currents, now
+            self.fill_iv_now([{'voltage': v, 'current': c} for v, c in zip(voltages, currents)])
+            self.LastUpdate = now
+            self.IOLock.notify_update()
+
     def reset(self):
-        self.write('*RST')
-        self.Serial.readall()
-        return self.Serial.inWaiting()
+        with self.IOLock:
+            self.write('*RST')
+            self.Transport.read_lines(timeout=.5)
+            return self.Transport.in_waiting
 
     def clear_error_queue(self):
-        self.write('*CLS')
-        self.Serial.readall()
-        return self.Serial.inWaiting()
+        with self.IOLock:
+            self.write('*CLS')
+            self.Transport.read_lines(timeout=.5)
+            return self.Transport.in_waiting
 
     def clear_buffer(self, warning=True, command=''):
-        busy = self.Busy
-        self.Busy = True
-        retval = ''
-        if self.bOpen:
-            while self.Serial.inWaiting():
-                while self.Serial.inWaiting():
-                    retval += self.__read()
-                sleep(self.ReadSleepTime)
-        else:
-            pass
+        if not self.bOpen:
+            return 0
+        with self.IOLock:
+            retval = self.Transport.clear()
         if retval != '' and warning:
             msg = 'Buffer was not empty when reading  %s: "%s"' % (command, retval)
             msg += ',\n\t last command: "%s"' % self.last_write
             warnings.warn(msg)
-        self.Busy = busy
-        return self.Serial.inWaiting()
+        return self.Transport.in_waiting
 
     # ============================
     # region ACCESS FUNCTIONS
-    def wait_for_unbusy(self):
-        now = time()
-        while self.Busy:
-            sleep(.1)
-            if time() - now > 20:
-                self.Busy = False
-                warnings.warn('Device stucked. Waiting for more than 20sec to unbusy - Reset Busy')
-
     def get_answer_for_query(self, data, minlength=1):
-        self.wait_for_unbusy()
-        self.Busy = True
-        self.clear_buffer(command=data)
-        self.__write(data)
-        sleep(self.ReadSleepTime)
-        data = self.__read(minlength)
-        self.Busy = False
-        return clear_string(data)
+        with self.IOLock:
+            self.clear_buffer(command=data)
+            self.__write(data)
+            t = perf_counter()
+            answer = self.__read(minlength, self.Timing.get_timeout(data, self.ReadTimeout))
+            self.Timing.add(data, perf_counter() - t, answer != '')
+        return clear_string(answer)
 
     def write(self, data):
-        self.wait_for_unbusy()
-        self.Busy = True
-        self.__write(data)
-        self.Busy = False
+        with self.IOLock:
+            self.__write(data)
 
     def __write(self, data):
         # print 'write: "%s"' % data
         data += self.CommandEndCharacter
         self.last_write = data
-        output = self.Serial.write(str.encode(data)) if self.bOpen else True
-        sleep(self.WriteSleepTime)
-        return output == len(data)
+        if not self.bOpen:
+            return True
+        self.Timing.wait()
+        output = self.Transport.write(data)
+        self.Timing.sent()
+        return output
 
     def read(self, min_lenght=0):
-        self.wait_for_unbusy()
-        self.Busy = True
-        self.__read(min_lenght)
-        self.Busy = False
-
-    def __read(self, min_lenght=0):
-        # if not self.serial.inWaiting():
-        #     print 'there is nothing in the queue'
-        #     return
-        out = ''
+        with self.IOLock:
+            return self.__read(min_lenght)
+
+    def __read(self, min_lenght=0, timeout=None):
+        """:returns: the next line which is not the echo of a command ('' if there was none within the timeout)."""
         if not self.bOpen:
             if not self.bOpenInformed:
                 print('cannot read since Not serial port is not open')
                 self.bOpenInformed = False
             return ''
-        ts = time()
-        max_time = 300
-        k = 0
-        clear_first = False
-        while True:
-            while self.Serial.inWaiting() > 0 and time() - ts < max_time and not out.endswith(self.CommandEndCharacter):
-                out += self.Serial.read(1).decode()
-                k += 1
-            if out == '':
-                break
-            if out.endswith(self.CommandEndCharacter):
-                if out.startswith('*') or out.startswith(':'):
-                    out = ''
-                    continue
-                else:
-                    break
-            if time() - ts > max_time:
-                break
-            if 0 < min_lenght <= len(out):
-                break
-            sleep(self.ReadSleepTime)
-        if time() - ts > max_time:
-            print("Tried reading for %s seconds." % (time() - ts), out)
-            try:
-                print(ord(out[-2]), ord(out[-1]), ord(self.CommandEndCharacter[0]), ord(self.CommandEndCharacter[1]))
-            except IndexError:
-                print("Error trying: 'print ord(out[-2]),ord(out[-1]),"
-                      "ord(self.commandEndCharacter[0]),ord(self.commandEndCharacter[1]),len(out)'")
+        out = self.Transport.read_line(timeout)
+        while out is not None and (out.startswith('*') or out.startswith(':')):
+            out = self.Transport.read_line(timeout)
+        if out is None:
+            warning('Tried reading for {:.2f} s, received: "{}"'.format(self.Transport.Timeout if timeout is None else timeout, self.Transport.Buffer.decode(errors='replace')))
             return ''
-        # print 'received after %s tries: %s' % (k, out)
         return out
     # endregion
 
@@ -451,6 +476,7 @@ class ISEG(Device):
                     self.LastStatusUpdate = now
                     return self.LastStatus
                 except Exception as err:
+                    self.NStatusRetries += 1
                     warning('No valid channel status, retry: {}'.format(err))
                     self.clear_buffer(warning=False)
         return self.LastStatus
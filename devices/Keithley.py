@@ -6,6 +6,9 @@ import sys
 from collections import deque
 import serial
 from .device import *
+from .transport import LineTransport
+from .timing import CommandTiming
+from time import perf_counter
 
 
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -14,6 +17,10 @@ sys.path.insert(0, parentdir)
 
 
 class Keithley(Device):
+
+    AsyncPoll = True
+    CanBuffer = False  # driver implements the buffered acquisition (update_iv with blocks of time stamped samples)
+
     def __init__(self, device_no, config, hot_start=False):
 
         Device.__init__(self, device_no, config, hot_start)
@@ -26,14 +33,21 @@ class Keithley(Device):
         self.serial = None
         self.commandEndCharacter = chr(13) + chr(10)
 
-        self.writeSleepTime = 0.1
-        self.readSleepTime = 0.2
+        self.Timing = CommandTiming(self.ModelNumber)
         self.measurements = deque()
         self.last_voltage = 0
         self.identifier = None
         self.Model = None
         self.MaxVoltage = None
         self.manual = False
+
+        # Buffered acquisition
+        self.Buffered = self.CanBuffer and self.Config.getboolean(self.Config.Section, 'buffered', fallback=False)
+        self.NPLC = self.Config.get_value('nplc', float, default=1)
+        self.BufferSize = self.Config.get_value('buffer size', int, default=50)
+        self.LineFrequency = 50
+        self.BlockStart = None  # host time when the running block was armed
+        self.SetBias = None  # last commanded voltage, the ramp steps from it while the measurements arrive in blocks
         self.open_serial_port()
 
     def connect(self):
@@ -42,6 +56,7 @@ class Keithley(Device):
     def open_serial_port(self):
         try:
             self.serial = serial.Serial(port=self.SerialPortName, baudrate=57600, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE, bytesize=serial.EIGHTBITS, timeout=1, )
+            self.Transport = LineTransport(self.serial, self.commandEndCharacter, self.ReadTimeout)
             self.bOpen = True
             info('Open serial port: {}'.format(self.SerialPortName))
         except serial.SerialException:
@@ -78,13 +93,10 @@ class Keithley(Device):
         return self.write('*CLS')
 
     def clear_buffer(self):
-        if self.bOpen:
-            while self.serial.inWaiting():
-                self.read()
-                sleep(self.readSleepTime)
-        else:
-            pass
-        return self.write(':TRAC:CLEAR')
+        with self.IOLock:
+            if self.bOpen:
+                self.Transport.clear()
+            return self.write(':TRAC:CLEAR')
 
     def identify(self):
         self.identifier = self.get_answer_for_query('*IDN?')
@@ -96,10 +108,9 @@ class Keithley(Device):
         warning('set_bias not implemented')
 
     def set_immediate_voltage(self, voltage):
-        voltage = self.validate_voltage(voltage)
-        data = ('SOUR:VOLT:LEV:IMM:AMPL ' if self.Model == '6517B' else 'SOUR:VOLT:IMM:AMPL ')
-        data += voltage
-        return self.write(data)
+        if self.validate_voltage(voltage):
+            data = ('SOUR:VOLT:LEV:IMM:AMPL ' if self.Model == '6517B' else 'SOUR:VOLT:IMM:AMPL ')
+            return self.write(data + str(voltage))
 
     def set_max_voltage(self):
         if self.Model == '6517B':
@@ -172,50 +183,34 @@ class Keithley(Device):
     # ============================
     # ACCESS FUNCTIONS
     def get_answer_for_query(self, data, minlength=1):
-        self.write(data)
-        sleep(self.readSleepTime)
-        data = self.read(minlength)
-        return clear_string(data)
+        with self.IOLock:
+            self.write(data)
+            t = perf_counter()
+            answer = self.read(minlength, self.Timing.get_timeout(data, self.ReadTimeout))
+            self.Timing.add(data, perf_counter() - t, answer != '')
+        return clear_string(answer)
 
     def write(self, data):
-        data += self.commandEndCharacter
-        if self.bOpen:
-            output = self.serial.write(str.encode(data))
-        else:
-            output = True
-        sleep(self.writeSleepTime)
-        return output == len(data)
-
-    def read(self, min_lenght=0):
-        out = ''
+        if not self.bOpen:
+            return True
+        with self.IOLock:
+            self.Timing.wait()
+            output = self.Transport.write(data)
+            self.Timing.sent()
+        return output
+
+    def read(self, min_lenght=0, timeout=None):
+        """:returns: the next line of the device without the terminator ('' if there was none within [timeout] seconds, default: ReadTimeout)."""
         if not self.bOpen:
             if not self.bOpenInformed:
                 print('cannot read since Not serial port is not open')
                 self.bOpenInformed = False
             return ''
-        ts = time()
-        max_time = 300
-        k = 0
-        while True:
-            while self.serial.inWaiting() > 0 and time() - ts < max_time and not out.endswith(self.commandEndCharacter):
-                out += self.serial.read(1).decode()
-                k += 1
-            if out.endswith(self.commandEndCharacter):
-                break
-            if time() - ts > max_time:
-                break
-            if 0 < min_lenght <= len(out):
-                break
-            sleep(self.readSleepTime)
-        if time() - ts > max_time:
-            print(("Tried reading for %s seconds." % (time() - ts), out))
-            try:
-                print((ord(out[-2]), ord(out[-1]), ord(self.commandEndCharacter[0]), ord(self.commandEndCharacter[1])))
-            except IndexError:
-                print("Error trying: 'print ord(out[-2]),ord(out[-1]),"
-                      "ord(self.commandEndCharacter[0]),ord(self.commandEndCharacter[1]),len(out)'")
+        with self.IOLock:
+            out = self.Transport.read_line(timeout)
+        if out is None:
+            warning('Tried reading for {:.2f} s, received: "{}"'.format(self.Transport.Timeout if timeout is None else timeout, self.Transport.Buffer.decode(errors='replace')))
             return ''
-        # print 'received after %s tries: %s' % (k, out)
         return out
 
     # ============================
@@ -233,7 +228,18 @@ class Keithley(Device):
         pass
 
     def read_iv(self):
-        answer = self.get_answer_for_query(':READ?', 20)
+        return self.parse_iv(self.get_answer_for_query(':READ?', 20))
+
+    async def async_update_iv(self):
+        answer = await self.async_query(':OUTP?')
+        if isint(answer):
+            self.set_status(0, int(answer))
+        if any(self.Status):
+            self.fill_iv_now(self.parse_iv(await self.async_query(':READ?')))
+            self.LastUpdate = time()
+            self.IOLock.notify_update()
+
+    def parse_iv(self, answer):
         try:
             answer = answer.split()
             voltage = float(answer[0])
@@ -249,6 +255,16 @@ class Keithley(Device):
             print(err)
             raise Exception('Could not perform valid IV Measurement, received "%s"' % answer)
 
+    # ============================
+    # region BUFFERED ACQUISITION
+    def get_set_bias(self, channel=0):
+        return self.SetBias if self.Buffered and self.SetBias is not None else self.get_bias(channel)
+
+    def get_block_time(self):
+        """:returns: estimated duration of one block (integration of voltage and current plus auto zero)."""
+        return 3 * self.BufferSize * self.NPLC / self.LineFrequency
+    # endregion BUFFERED ACQUISITION
+
     # ============================
     # HELPER FUNCTIONS
 
@@ -17,17 +17,15 @@ import math
 # MAIN CLASS
 # ============================
 class Keithley23X(Keithley):
-    def __init__(self, device_no, config, hot_start=False, init=True):
-        Keithley.__init__(self, device_no, config, hot_start)
-        self.Busy = False
-        self.bOpen = False
-        self.read_config()
+
+    AsyncPoll = False  # GPIB via Prologix with its own protocol
+
+    def __init__(self, device_no, config, hot_start=False, init=True, print_logs=False):
+        Keithley.__init__(self, device_no, config, hot_start)  # opens the port with open_serial_port of this class
         self.lastVoltage = 0
-        self.serial = None
         self.model = 237
         self.identifier = None
         self.answer_time = 0.1
-        self.open_serial_port()
         if init:
             self.init_keithley(hot_start)
         else:
@@ -35,6 +33,7 @@ class Keithley23X(Keithley):
         pass
 
     def open_serial_port(self):
+        self.read_config()
         try:
             self.serial = serial.Serial(
                 port=self.serialPortName,
@@ -44,6 +43,7 @@ class Keithley23X(Keithley):
                 bytesize=serial.EIGHTBITS,
                 timeout=1,
             )
+            self.Transport = LineTransport(self.serial, self.commandEndCharacter, self.ReadTimeout)
             self.bOpen = True
             print('Open serial port: \'%s\'' % self.serialPortName)
         except:
@@ -55,13 +55,13 @@ class Keithley23X(Keithley):
 
     def enable_system_controller(self):
         if self.bOpen:
-            self.serial.write('++ifc %d' % self.gbip)
+            self.Transport.write('++ifc %d' % self.gbip)
             print('Sending InterFaceClear (IFC) to force the instruments to listen to the system controller')
         sleep(.2)
 
     def set_gbip_address(self):
         if self.bOpen:
-            self.serial.write('++addr %d' % self.gbip)
+            self.Transport.write('++addr %d' % self.gbip)
             self.__write('++addr ', 1)
             print('Set GBIP Address to %d' % self.gbip)
 
@@ -178,45 +178,29 @@ class Keithley23X(Keithley):
         return self.__write(message)[1][-1]
 
     def __write(self, message, max_time=10):
-        time0 = time()
-        while self.Busy:
-            if time() - time0 > 10:
-                raise Exception('Cannot write - device is busy')
-            sleep(.1)
-        self.Busy = True
-        if not message.startswith('++') and (not message.endswith('\r\n')):
-            message += '\r\n'
+        self.IOLock.acquire(timeout=10)
+        try:
+            return self.__transaction(message, max_time)
+        finally:
+            self.IOLock.release()
+
+    def __transaction(self, message, max_time):
         if not self.bOpen:
-            self.Busy = False
             return -1, []
-        retVal = self.serial.write(message)
-        time0 = time()
-        while not self.serial.inWaiting():
-            time1 = time()
-            if time1 - time0 > max_time:
-                break
-            pass
-        # print 'DELTA T: ', time1-time0
-        sleep(.1)
-        retMsg = []
-        exception_counter = 0
-        while self.serial.inWaiting() and exception_counter < 10:
-            try:
-                retMsg.append(self.serial.readline().strip('\r\n'))
-            except serial.SerialException as e:
-                print('Serial Exception! ', e)
-                exception_counter += 1
-            except Exception as e:
-                self.Busy = False
-                raise e
-        self.Busy = False
-        return retVal, retMsg
+        self.Timing.wait()
+        retVal = self.Transport.write(message)
+        self.Timing.sent()
+        t = perf_counter()
+        lines = self.Transport.read_lines(timeout=max_time)
+        if not message.startswith('++'):
+            self.Timing.add(message, perf_counter() - t, len(lines) > 0)
+        return retVal, lines
 
     def set_eoi_and_bus_hold_off(self, eoi, hold_off):
         val = ((not eoi) << 0) + ((not hold_off) << 1)
         self.__execute('K%d' % val)
 
-    def set_output(self, status):
+    def set_output(self, status, channel=0):
         if status == True or status == 1:
             return self.__execute('N1')
         else:
@@ -745,7 +729,7 @@ class Keithley23X(Keithley):
             raise IndexError('Cannot find operate in machine status word: %s' % retVal)
         return retVal['operate']
 
-    def get_output_status(self):
+    def get_output_status(self, channel=0):
         return self.get_output()
 
     def read_iv(self):
@@ -753,13 +737,13 @@ class Keithley23X(Keithley):
         converted = self.extract_data(retVal)
         current = converted['measure_value']
         voltage = converted['source_value']
-        return {'current': current, 'voltage': voltage}
+        return [{'current': current, 'voltage': voltage}]
 
     def read_current(self):
-        return self.read_iv()['current']
+        return self.read_iv()[0]['current']
 
     def read_voltage(self):
-        return self.read_iv()['voltage']
+        return self.read_iv()[0]['voltage']
         pass
 
     def get_model_name(self):
@@ -1,14 +1,20 @@
 import math
 from configparser import NoOptionError
+from numpy import count_nonzero
 from .Keithley import *
+from HVClient.src.log_parser import DataType
 
 
 class Keithley24XX(Keithley):
+
+    CanBuffer = True
+
     def __init__(self, device_no, config, hot_start=False, print_logs=False):
         Keithley.__init__(self, device_no, config, hot_start)
         self.removeCharacters = '\r\n\x00\x13\x11\x10'
-        self.init_keithley(hot_start)
         self.output = ''
+
+        self.init_keithley(hot_start)
         self.hot_start()
 
     def init_keithley(self, hot_start=False):
@@ -34,12 +40,69 @@ class Keithley24XX(Keithley):
 
         sleep(.3)
         self.clear_error_queue()
+        if self.Buffered:
+            self.init_buffer()
+
+    # ============================
+    # region BUFFERED ACQUISITION
+    def init_buffer(self):
+        """Let the instrument take blocks of [BufferSize] samples at [NPLC] autonomously and store them in the trace buffer."""
+        answer = self.get_answer_for_query(':SYST:LFR?')
+        self.LineFrequency = float(answer) if isfloat(answer) else 50
+        self.set_standard_output_format(':FORM:ELEM VOLT,CURR,TIME,STAT')
+        self.set_measurement_speed(self.NPLC)
+        self.write(':TRAC:CLE')
+        self.write(':TRAC:POIN {}'.format(self.BufferSize))
+        self.write(':TRAC:FEED SENS')
+        self.set_trigger_counter(self.BufferSize)
+        info('Buffered acquisition of {} samples at {} NPLC'.format(self.BufferSize, self.NPLC))
+
+    def arm(self):
+        with self.IOLock:
+            self.write(':TRAC:CLE')
+            self.write(':TRAC:FEED:CONT NEXT')
+            self.write(':SYST:TIME:RES')
+            self.BlockStart = time()
+            self.write(':INIT')
+
+    def read_buffer(self):
+        """:returns: the time stamped samples of the trace buffer as structured array with time, bias and current."""
+        answer = self.get_answer_for_query(':TRAC:DATA?')
+        values = array(answer.split(), 'd').reshape(-1, 4)  # VOLT, CURR, TIME, STAT
+        data = zeros(values.shape[0], DataType)
+        data['time'], data['bias'], data['current'] = self.BlockStart + values[:, 2], values[:, 0], values[:, 1]
+        n_compliance = count_nonzero(values[:, 3].astype('i8') & 0x08)
+        if n_compliance:
+            warning('{} of {} samples in compliance'.format(n_compliance, data.size))
+        return data
+
+    def update_iv(self):
+        """Fetch the block when the instrument is done and re-arm it (only status queries in between blocks)."""
+        if not self.Buffered:
+            return Keithley.update_iv(self)
+        if self.BlockStart is not None:
+            if time() < self.BlockStart + self.get_block_time():
+                return  # still sampling
+            try:
+                self.add_samples(self.read_buffer())
+                self.IOLock.notify_update()
+            except Exception as err:
+                self.NReadFailures += 1
+                warning('Could not read the trace buffer: {}'.format(err))
+                self.clear_buffer()
+        self.update_status()
+        if any(self.Status):
+            self.arm()
+        else:
+            self.BlockStart = None
+    # endregion BUFFERED ACQUISITION
 
     # ============================
     # SET-FUNCTIONS
 
     def set_bias(self, voltage, channel=0):
         if self.validate_voltage(voltage):
+            self.SetBias = voltage
             return self.write(':SOUR:VOLT %s' % voltage)
 
     def set_beeper(self, status):
@@ -14,9 +14,43 @@ parentdir = os.path.dirname(currentdir)
 sys.path.insert(0, parentdir)
 from .Keithley import *
 from time import sleep
+from numpy import count_nonzero
+from HVClient.src.log_parser import DataType
 
 
 class Keithley2657(Keithley):
+
+    AsyncPoll = False  # VISA over TCP
+    CanBuffer = True
+
+    # measurement loop on the instrument: fills the current (nvbuffer1) and voltage (nvbuffer2) buffers with time stamps using the trigger model
+    Script = '''function hvclient_arm(n, nplc)
+  smua.nvbuffer1.clear()
+  smua.nvbuffer2.clear()
+  smua.nvbuffer1.collecttimestamps = 1
+  smua.nvbuffer2.collecttimestamps = 1
+  smua.measure.nplc = nplc
+  smua.trigger.measure.iv(smua.nvbuffer1, smua.nvbuffer2)
+  smua.trigger.measure.action = smua.ENABLE
+  smua.trigger.source.action = smua.DISABLE
+  smua.trigger.count = n
+  smua.trigger.arm.count = 1
+  smua.trigger.initiate()
+end
+function hvclient_fetch(n, nplc, rearm)
+  waitcomplete()
+  local m = smua.nvbuffer1.n
+  if m > 0 then
+    printbuffer(1, m, smua.nvbuffer1.timestamps, smua.nvbuffer2.readings, smua.nvbuffer1.readings, smua.nvbuffer1.statuses)
+  else
+    print('')
+  end
+  if rearm == 1 then
+    hvclient_arm(n, nplc)
+  end
+end'''
+    ComplianceBit = 0x40  # of the reading buffer status
+
     def __init__(self, device_no, config, hot_start=False, print_logs=False):
         Keithley.__init__(self, device_no, config, hot_start)
         self.bOpen = False
@@ -29,6 +63,8 @@ class Keithley2657(Keithley):
         self.max_voltage = 3000
         self.read_config()
         self.init_keithley(hot_start)
+        if self.Buffered:
+            self.load_script()
 
     def read_config(self):
         self.compliance = self.Config.get_value('compliance', float, default=1e-6)
@@ -46,6 +82,11 @@ class Keithley2657(Keithley):
         sock.close()
         return retVal
 
+    def close(self):
+        Keithley.close(self)
+        if self.inst is not None:
+            self.inst.close()
+
     def close_all_open_connections(self):
         port = 5030
         print('closing all open connections by opening/closing port %d' % port)
@@ -123,13 +164,15 @@ class Keithley2657(Keithley):
             error_count, error_code, msg = self.get_next_error_message()
 
     def __query(self, query):
-        retVal = self.inst.query(query).strip('\n')
-        self.__check_for_errors(query)
+        with self.IOLock:
+            retVal = self.inst.query(query).strip('\n')
+            self.__check_for_errors(query)
         return retVal
 
     def __write(self, value):
-        retVal = self.inst.write(value)
-        self.__check_for_errors(value)
+        with self.IOLock:
+            retVal = self.inst.write(value)
+            self.__check_for_errors(value)
         # sleep(.1)
         return retVal
 
@@ -139,7 +182,8 @@ class Keithley2657(Keithley):
         self.__write('%s = %s' % (variable, value))
 
     def __read(self):
-        return self.inst.read()
+        with self.IOLock:
+            return self.inst.read()
 
     def __print_string(self, value):
         return 'print(%s)' % value
@@ -261,6 +305,7 @@ class Keithley2657(Keithley):
         # print 'set_bias: ',voltage,type(voltage)
         retVal = self.__write('smua.source.levelv = %f' % voltage)
         self.target_voltage = voltage
+        self.SetBias = voltage
         sleep(.5)
         return self.get_bias()
 
@@ -323,6 +368,59 @@ class Keithley2657(Keithley):
             sys.stdout.flush()
         return {'current': current, 'voltage': voltage, 'compliance': compl}
 
+    # ============================
+    # region BUFFERED ACQUISITION
+    def load_script(self):
+        """Upload and run the TSP script which defines the measurement loop of the buffered acquisition."""
+        with self.IOLock:
+            self.__write('loadscript HVClientAcquire')
+            for line in Keithley2657.Script.split('\n'):
+                self.__write(line)
+            self.__write('endscript')
+            self.__write('HVClientAcquire()')
+        self.LineFrequency = self.get_linefreq()
+        info('Buffered acquisition of {} samples at {} NPLC'.format(self.BufferSize, self.NPLC))
+
+    def arm(self):
+        self.__write('hvclient_arm({}, {})'.format(self.BufferSize, self.NPLC))
+        self.BlockStart = time()
+
+    def fetch(self, rearm=True):
+        """ Read the buffers of the finished block and re-arm the trigger model in the same call.
+            :returns: the time stamped samples as structured array with time, bias and current. """
+        with self.IOLock:
+            answer = self.__query('hvclient_fetch({}, {}, {:d})'.format(self.BufferSize, self.NPLC, rearm))
+            start, self.BlockStart = self.BlockStart, time() if rearm else None
+        values = array(answer.replace(',', ' ').split(), 'd').reshape(-1, 4)  # time stamp, voltage, current, status
+        data = zeros(values.shape[0], DataType)
+        data['time'], data['bias'], data['current'] = start + values[:, 0], values[:, 1], values[:, 2]
+        n_compliance = count_nonzero(values[:, 3].astype('i8') & Keithley2657.ComplianceBit)
+        if n_compliance:
+            warning('{} of {} samples in compliance'.format(n_compliance, data.size))
+        return data
+
+    def update_iv(self):
+        """Fetch the block when the instrument is done (one VISA round trip per block instead of up to four per sample)."""
+        if not self.Buffered:
+            return Keithley.update_iv(self)
+        if self.BlockStart is not None and time() < self.BlockStart + self.get_block_time():
+            return  # still sampling
+        self.update_status()
+        on = any(self.Status)
+        if self.BlockStart is None:
+            if on:
+                self.arm()
+            return
+        try:
+            self.add_samples(self.fetch(rearm=on))
+            self.IOLock.notify_update()
+        except Exception as err:
+            self.NReadFailures += 1
+            warning('Could not read the buffers: {}'.format(err))
+            self.clear_readout()
+            self.BlockStart = None
+    # endregion BUFFERED ACQUISITION
+
     def set_output(self, status, channel=None):
         self.__write('smua.source.output = %d' % status)
         return self.get_output()
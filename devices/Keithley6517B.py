@@ -4,7 +4,7 @@ from .Keithley import *
 
 
 class Keithley6517B(Keithley):
-    def __init__(self, device_no, config, hot_start=False):
+    def __init__(self, device_no, config, hot_start=False, print_logs=False):
         Keithley.__init__(self, device_no, config)
         self.measure_value = 'CURR'
         self.init_keithley(hot_start)
@@ -77,10 +77,9 @@ class Keithley6517B(Keithley):
     # ============================
     # SET-FUNCTIONS
     def set_bias(self, voltage, channel=None):
-        voltage = self.validate_voltage(voltage)
-        self.set_range_voltage('low') if abs(voltage) <= 100 else self.set_range_voltage('high')
-        data = ':SOUR:VOLT ' + str(voltage)
-        return self.write(data)
+        if self.validate_voltage(voltage):
+            self.set_range_voltage('low') if abs(voltage) <= 100 else self.set_range_voltage('high')
+            return self.write(':SOUR:VOLT %s' % voltage)
 
     def set_range_voltage(self, status):
         data = ':SOUR:VOLT:RANG 1000' if status == 'high' else ':SOUR:VOLT:RANG 100'
@@ -1,19 +1,29 @@
 from glob import glob
 from math import copysign
-from os.path import join
-from threading import Thread
-from time import sleep
-from os import SEEK_END
+from os.path import join, isfile
+from collections import deque
+from threading import Thread, Lock
+from time import sleep, perf_counter
 
 from HVClient.src.logger import Logger
+from HVClient.src.binary_log import BinaryLog, load_binary_logs
+from HVClient.src.log_parser import parse_logs
+from HVClient.src.log_follower import LogFollower
+from HVClient.src.rollup import load_rollups, select_level, to_envelope, Levels
 from HVClient.src.utils import *
 from HVClient.src.config import Config
-from numpy import sign
+from HVClient.src.io_lock import IOLock, IOTimeout
+from HVClient.src.poll_scheduler import PollScheduler
+from HVClient.src.publisher import Publisher
+from numpy import sign, concatenate
 
 __author__ = 'Michael Reichmann'
 
 
 class Device(Thread):
+
+    AsyncPoll = False  # driver implements async_update_iv
+
     def __init__(self, device_num, config='main', hot_start=True, print_logs=False, init_logger=True, start_time='now'):
         Thread.__init__(self)
 
@@ -44,10 +54,24 @@ class Device(Thread):
 
         # Status
         self.IsKilled = False
-        self.IsBusy = False
         self.IsManual = False
         self.IsPoweringDown = zeros(self.NChannels, bool)
         self.MaxWaitingTime = 20    # seconds
+        self.IOLock = IOLock(self.Config.Section, self.MaxWaitingTime)  # all transactions with the device have to hold this lock
+        self.Timing = None  # command timing of the serial devices
+        self.Transport = None  # line transport of the serial devices
+        self.ReadTimeout = self.Config.get_value('read timeout', float, default=1.)  # upper limit, the queries wait a multiple of their learned latency
+        self.AsyncTransport = None
+        self.Engine = None
+        self.PollPeriod = self.Config.get_value('poll period', float, default=.1)  # steady state
+        self.RampPollPeriod = self.Config.get_value('ramp poll period', float, default=min(.1, self.PollPeriod))
+        self.Scheduler = PollScheduler()
+        self.NReadings = 0
+        self.NReadFailures = 0
+        self.Number = int(device_num)
+        self.Publisher = Publisher.get(self.Config) if init_logger else None  # live readings for other processes
+        self.Buffered = False  # the device samples autonomously and provides blocks of time stamped measurements
+        self.Samples = {channel: deque() for channel in self.ActiveChannels}
 
         self.LastVChange = time()
         self.LastUpdate = time()
@@ -56,13 +80,26 @@ class Device(Thread):
         self.Logger = self.init_logger(init_logger)
         self.FromLogs = False
         self.StartTime = self.load_start_time(start_time)
+        self.Followers = {}  # channel -> LogFollower (display mode), started where the initial read of the logs stopped
+        self.FollowerLock = Lock()
+        self.NewData = {channel: deque() for channel in self.ActiveChannels}
+        self.DisplayPoints = self.Config.get_value('display points', int, 'Data', default=2000)
 
         print('---------------------------------------')
 
+    def start(self):
+        """Poll the device in the shared async engine if it is enabled in the config, otherwise in its own thread."""
+        if self.Config.get_value('engine', section='Devices', default='thread') != 'async':
+            return Thread.start(self)
+        from HVClient.src.async_engine import AsyncEngine  # asyncio is only imported if the engine is used
+        self.Engine = AsyncEngine.get(self.Config)
+        self.Engine.add(self)
+
     def run(self):
         """Main loop for the thread."""
         while not self.IsKilled:
-            sleep(.5 if self.FromLogs else .1)
+            sleep(self.Scheduler.get_delay(self.get_poll_period()))
+            self.Scheduler.start()
             if not self.IsManual:
                 if not self.FromLogs:
                     self.update_voltage_current()
@@ -70,14 +107,28 @@ class Device(Thread):
                     self.ramp()
                 else:
                     self.update()
+            self.Scheduler.done()
 
     def stop(self):
         self.IsKilled = True
         critical('exiting')
 
+    def close(self):
+        """Stop polling and release the port and the log files."""
+        self.IsKilled = True
+        for logger in self.Logger:
+            logger.close()
+        if self.Transport is not None:
+            self.Transport.Port.close()
+
     def write_logs(self):
         for channel in self.ActiveChannels:
-            self.Logger[channel].write_log(self.get_status(channel), self.get_bias(channel), self.get_current(channel), self.is_ramping(channel), self.get_target_bias(channel), prnt=self.PrintLogs)
+            if self.Buffered:
+                while self.Samples[channel]:
+                    for t, bias, current in self.Samples[channel].popleft():
+                        self.Logger[channel].write_log(self.get_status(channel), bias, current, self.is_ramping(channel), self.get_target_bias(channel), prnt=self.PrintLogs, t=t)
+            else:
+                self.Logger[channel].write_log(self.get_status(channel), self.get_bias(channel), self.get_current(channel), self.is_ramping(channel), self.get_target_bias(channel), prnt=self.PrintLogs)
 
     def connect(self):
         warning('"connect" not implemented')
@@ -94,17 +145,54 @@ class Device(Thread):
                 self.BiasNow[channel] = voltage
 
     def update(self):
-        data = self.get_last_data()
-        for channel in self.ActiveChannels:
-            self.BiasNow[channel] = data[channel][1]
-            self.CurrentNow[channel] = data[channel][2]
-            if data[channel][0]:
-                self.LastUpdate = data[channel][0]
+        """Read all new records of the log files (display mode)."""
+        with self.FollowerLock:
+            for channel, follower in self.Followers.items():
+                data = follower.poll()[0]
+                if data.size:
+                    self.NewData[channel].append(data)
+                    self.BiasNow[channel] = data['bias'][-1]
+                    self.CurrentNow[channel] = data['current'][-1]
+                    self.LastUpdate = data['time'][-1]
 
     def update_status(self):
         for channel in self.ActiveChannels:
             self.set_status(channel, self.get_output_status(channel))
 
+    def get_poll_period(self):
+        """:returns: target time between two poll cycles, shorter while any channel is ramping or powering down."""
+        if self.FromLogs:
+            return .5
+        return self.RampPollPeriod if any(self.is_ramping(ch) or self.IsPoweringDown[ch] for ch in self.ActiveChannels) else self.PollPeriod
+
+    # -----------------------------------
+    # region ASYNC
+    def uses_async_poll(self):
+        return self.AsyncPoll and not self.Buffered and hasattr(self, 'async_update_iv')
+
+    def is_echo(self, line):
+        """:returns: True if the [line] is the echo of a command and not an answer."""
+        return False
+
+    async def async_query(self, cmd):
+        """:returns: the answer to [cmd] via the non-blocking transport ('' if there was none within the timeout)."""
+        if self.Timing is not None and self.Timing.get_delay() > 0:
+            from asyncio import sleep as async_sleep
+            await async_sleep(self.Timing.get_delay())
+        await self.AsyncTransport.write(cmd)
+        t = perf_counter()
+        if self.Timing is not None:
+            self.Timing.sent()
+        timeout = self.Timing.get_timeout(cmd, self.ReadTimeout) if self.Timing is not None else self.ReadTimeout
+        line = await self.AsyncTransport.read_line(timeout)
+        while line is not None and self.is_echo(line):
+            line = await self.AsyncTransport.read_line(timeout)
+        if self.Timing is not None:
+            self.Timing.add(cmd, perf_counter() - t, line is not None)
+        return '' if line is None else clear_string(line)
+    # endregion ASYNC
+    # -----------------------------------
+
     # -----------------------------------
     # region INIT
     def init_logger(self, init=True):
@@ -144,6 +232,10 @@ class Device(Thread):
     def get_bias(self, channel=0):
         return self.BiasNow[channel]
 
+    def get_set_bias(self, channel=0):
+        """:returns: voltage from which the software ramp continues, the measured one unless the measurements lag behind the commands (buffered acquisition)."""
+        return self.get_bias(channel)
+
     def get_target_bias(self, channel=0):
         return self.TargetBias[channel]
 
@@ -166,48 +258,59 @@ class Device(Thread):
         return self.LastUpdate
 
     def get_data_from_logs(self, channel=0):
-        files = sorted(glob(join(self.Logger[channel].LogFileDir, '*')))
+        """:returns: measurements after the start time, long time windows are taken from the coarsest rollup with enough points and only the rest from the raw logs."""
+        start = self.StartTime.timestamp()
+        position = LogFollower.get_position(self.Logger[channel].LogFileDir)  # before reading, so the follower continues without a gap
+        rollup = self.get_rollup(channel, start)
+        start = rollup['time'][-1] if rollup is not None and rollup.size else start
+        data = self.get_data_from_binary_logs(channel, start) if self.Logger[channel].Binary else self.read_logs(channel, start)[0]
+        if self.FromLogs and channel in self.ActiveChannels:
+            with self.FollowerLock:
+                if channel in self.Followers:
+                    self.Followers[channel].close()
+                self.Followers[channel] = LogFollower(self.Logger[channel].LogFileDir, position)
+                self.NewData[channel].clear()
+        return concatenate([to_envelope(rollup[:-1], data.dtype), data]) if rollup is not None and rollup.size else data
+
+    def get_events_from_logs(self, channel=0):
+        return self.read_logs(channel)[1]
+
+    def get_log_files(self, channel=0, start=None):
+        """:returns: text log files which contain data after the epoch time [start] (default: start time)."""
+        files = sorted(glob(join(self.Logger[channel].LogFileDir, '*.log')))
         if not files:
-            return []
-        dates = [datetime.strptime('-'.join(basename(f).strip('.log').split('_')[-6:]), '%Y-%m-%d-%H-%M-%S') for f in files]
-
-        first_file_ind = dates.index(next(d for d in dates if d > self.StartTime)) - 1 if self.StartTime < dates[-1] else -1
+            return files
+        start = self.StartTime if start is None else datetime.fromtimestamp(start)
+        dates = [Logger.get_file_date(f) for f in files]
+        first_file_ind = dates.index(next(d for d in dates if d > start)) - 1 if start < dates[-1] else len(files) - 1
+        return files[max(first_file_ind, 0):]
+
+    def read_logs(self, channel=0, start=None):
+        """:returns: measurements and events of the text logs after the epoch time [start] (default: start time)."""
+        return parse_logs(self.get_log_files(channel, start), self.StartTime.timestamp() if start is None else start)
+
+    def get_data_from_binary_logs(self, channel=0, start=None):
+        files = [BinaryLog.make_file_name(f) for f in self.get_log_files(channel, start)]
+        data = load_binary_logs([f for f in files if isfile(f)], self.StartTime.timestamp() if start is None else start)
+        return data[data['status'] > 0]  # the text logs only contain measurements when the device is ON
+
+    def get_rollup(self, channel=0, start=0):
+        """:returns: rollup of the coarsest level which gives enough points for the time window after [start] (None if the raw data has to be used)."""
+        level = select_level(time() - start, self.DisplayPoints)
+        return None if level is None else load_rollups(self.get_log_files(channel, start), level, start - Levels[level])
+
+    def get_new_data(self, channel=0):
+        """:returns: all measurements which were read from the logs since the last call."""
         data = []
-        for name, d in zip(files[first_file_ind:], dates[first_file_ind:]):
-            with open(name) as f:
-                for line in f.readlines():
-                    info_str = self.make_data(line, d)
-                    if info_str[0] and info_str[0] > self.StartTime:
-                        data.append(info_str)
-        return data
-
-    def get_last_data(self):
-        data = {}
-        for channel in self.ActiveChannels:
-            try:
-                filename = self.Logger[channel].get_log_file(prnt=False)
-                d = datetime.strptime('-'.join(basename(filename).strip('.log').split('_')[-6:]), '%Y-%m-%d-%H-%M-%S')
-                with open(filename, 'rb') as f:
-                    f.seek(-50, SEEK_END)
-                    info_str = f.readlines()[-1].decode("utf-8")
-                    data[channel] = self.make_data(str(info_str), d)
-            except IOError:
-                data[channel] = [0, 0, 0]
-        return data
+        while self.NewData[channel]:
+            data.append(self.NewData[channel].popleft())
+        return concatenate(data) if data else parse_logs([])[0]
 
     def get_id(self):
         return self.Config.get_value('short name', default='')
 
     def get_idname(self, channel=0):
         return '{}{} - {}'.format(self.get_id(), ', CH{}'.format(channel) if self.NChannels > 1 else '', self.Config.get_dut_names()[channel])
-
-    @staticmethod
-    def make_data(string, d):
-        data = string.split()
-        if isfloat(data[1]):
-            t = datetime.strptime(data[0], '%H:%M:%S')
-            return [d.replace(hour=t.hour, minute=t.minute, second=t.second), float(data[1]), float(data[2])]
-        return [0, 0, 0]
     # endregion GET
     # -----------------------------------
 
@@ -251,7 +354,7 @@ class Device(Thread):
     # -----------------------------------
     # region MISCELLANEOUS
     def is_ramping(self, channel=0):
-        return abs(self.get_bias(channel) - self.get_target_bias(channel)) > .1 if self.get_status(channel) else False
+        return abs(self.get_set_bias(channel) - self.get_target_bias(channel)) > .1 if self.get_status(channel) else False
 
     def all_are_ramping(self):
         return all(self.is_ramping(channel) for channel in self.ActiveChannels)
@@ -269,23 +372,44 @@ class Device(Thread):
         self.set_target_bias(0, channel)
         self.IsPoweringDown[channel] = True
 
-    def wait_for_device(self):
-        now = time()
-        while time() - now < self.MaxWaitingTime and self.IsBusy:
-            sleep(.2)
+    def wait_for_update(self, timeout=None):
+        """:returns: True as soon as the next measurement was read, False after [timeout] seconds."""
+        return self.IOLock.wait_for_update(timeout)
+
+    def get_lock_stats(self):
+        return self.IOLock.get_stats()
+
+    def get_channel_state(self, channel=0):
+        return {'name': self.get_name(channel), 'status': bool(self.get_status(channel)), 'bias': float(self.get_bias(channel)), 'current': float(self.get_current(channel)),
+                'target': float(self.get_target_bias(channel)), 'ramping': bool(self.is_ramping(channel)), 'powering down': bool(self.IsPoweringDown[channel]),
+                'ramp speed': float(self.get_ramp_speed(channel)), 'last update': self.get_last_update()}
+
+    def get_poll_stats(self):
+        """:returns: target and achieved poll period, jitter, busy time per cycle and number of overruns."""
+        return self.Scheduler.get_stats()
+
+    def get_latency_stats(self):
+        """:returns: number of queries, median and 99% quantile of the latency per query."""
+        return self.Timing.get_stats() if self.Timing is not None else {}
 
     def read_iv(self):
         warning('read_iv not implemented')
         return []
 
     def update_voltage_current(self):
-        self.wait_for_device()
-        self.IsBusy = True
+        try:
+            with self.IOLock:
+                self.update_iv()
+        except Exception as inst:
+            self.NReadFailures += 1
+            warning('Could not update voltage/current: {} {}'.format(type(inst), inst))
+
+    def update_iv(self):
         try:
             self.update_status()
         except Exception as inst:
+            self.NReadFailures += 1
             warning('Could not update voltage/current- get output status: {} {}'.format(inst, inst.args))
-            self.IsBusy = False
             return
         status = any(self.Status)
         if status:
@@ -293,14 +417,31 @@ class Device(Thread):
                 iv = self.read_iv()
                 self.fill_iv_now(iv)
                 self.LastUpdate = time()
+                self.IOLock.notify_update()
             except Exception as inst:
+                self.NReadFailures += 1
                 warning('Could not read valid iv {} {}'.format(type(inst), inst))
-        self.IsBusy = False
+
+    def add_samples(self, data, channel=0):
+        """Store a block of buffered measurements (structured array with time, bias and current), they are written to the logs with their own time stamps."""
+        if data.size:
+            self.NReadings += data.size
+            self.Samples[channel].append(data)
+            self.BiasNow[channel] = data['bias'][-1]
+            self.CurrentNow[channel] = data['current'][-1]
+            self.LastUpdate = data['time'][-1]
+            if self.Publisher is not None:
+                status, ramping = bool(self.get_status(channel)), bool(self.is_ramping(channel))
+                self.Publisher.publish([(t, self.Number, channel, bias, current, status, ramping) for t, bias, current in data[['time', 'bias', 'current']].tolist()])
 
     def fill_iv_now(self, data):
+        self.NReadings += 1
         for channel in self.ActiveChannels:
             self.BiasNow[channel] = data[channel]['voltage']
             self.CurrentNow[channel] = data[channel]['current']
+        if self.Publisher is not None:
+            t = time()
+            self.Publisher.publish([(t, self.Number, ch, self.BiasNow[ch], self.CurrentNow[ch], bool(self.get_status(ch)), bool(self.is_ramping(ch))) for ch in self.ActiveChannels])
 
     def get_bias_now(self, channel=0):
         return self.BiasNow[channel]
@@ -313,10 +454,10 @@ class Device(Thread):
 
     def calc_ramp_bias(self, channel=0):
         """ Calculate the next step of the voltage if there is no inherit ramping method. """
-        delta_v = self.get_target_bias(channel) - self.get_bias(channel)
+        delta_v = self.get_target_bias(channel) - self.get_set_bias(channel)
         step_size = copysign(abs(self.RampSpeed[channel] * (time() - self.LastVChange)), delta_v)  # get the voltage step by multiplying speed and update interval
         step_size = self.MaxStep[channel] if abs(step_size) > self.MaxStep[channel] else step_size
-        return self.get_target_bias(channel) if abs(delta_v) <= abs(step_size) else self.get_bias(channel) + step_size
+        return self.get_target_bias(channel) if abs(delta_v) <= abs(step_size) else self.get_set_bias(channel) + step_size
 
     def ramp(self):
         """ Try slowly ramp up the voltage by iteratively increasing the set voltage (if the device has not inherent ramping method) """
@@ -334,13 +475,16 @@ class Device(Thread):
 
         for channel in self.ActiveChannels:
             if self.is_ramping(channel):
-                self.IsBusy = True
-                new_bias = self.calc_ramp_bias(channel)
-                self.set_bias(new_bias, channel)
-                self.LastVChange = time()
+                try:
+                    with self.IOLock:
+                        new_bias = self.calc_ramp_bias(channel)
+                        self.set_bias(new_bias, channel)
+                        self.LastVChange = time()
+                except IOTimeout as err:
+                    warning('Could not ramp: {}'.format(err))
+                    continue
                 if new_bias == self.get_target_bias(channel) and not self.IsPoweringDown[channel]:
                     info('{} is done with ramping to {} V'.format(self.Config.Section, self.get_target_bias()))
-                self.IsBusy = False
     # endregion MISCELLANEOUS
     # -----------------------------------
 
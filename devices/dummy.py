@@ -21,7 +21,6 @@ class Dummy(Device):
         self.Model = self.get_model_name()
 
         # Info
-        self.Busy = False
         self.last_write = ''
         self.LastMeasurement = -1
         self.LastCurrents = []
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Protocol level simulators of the serial devices of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import os
+import pty
+import tty
+import re
+from argparse import ArgumentParser
+from random import random, gauss, choice
+from threading import Thread
+from time import time, sleep
+from os.path import exists, islink
+
+
+class Channel:
+    """ Output of a supply: the voltage follows the set voltage with [slew] V/s while the output is on, the current is given by the [resistance] of the load,
+        a leakage current with noise and it is clamped at the [compliance]. """
+
+    def __init__(self, slew=1000., resistance=1e11, compliance=1e-4, noise=.02):
+        self.On = False
+        self.SetVoltage = 0.
+        self.Voltage = 0.
+        self.Slew = slew
+        self.Resistance = resistance
+        self.Compliance = compliance
+        self.Noise = noise
+        self.Tripped = False
+        self.EmergencyOff = False
+        self.LastUpdate = time()
+
+    def update(self):
+        now = time()
+        target = self.SetVoltage if self.On and not self.Tripped and not self.EmergencyOff else 0.
+        step = self.Slew * (now - self.LastUpdate)
+        self.Voltage = target if abs(target - self.Voltage) <= step else self.Voltage + step * (1 if target > self.Voltage else -1)
+        self.LastUpdate = now
+
+    @property
+    def current(self):
+        self.update()
+        i = self.Voltage / self.Resistance * (1 + gauss(0, self.Noise)) + gauss(0, 1e-12)
+        return max(-self.Compliance, min(self.Compliance, i))
+
+    @property
+    def in_compliance(self):
+        return abs(self.Voltage / self.Resistance) >= self.Compliance
+
+    @property
+    def is_ramping(self):
+        self.update()
+        return self.On and abs(self.Voltage - self.SetVoltage) > .1
+
+    def trip(self):
+        self.Tripped = True
+        self.Voltage = 0.
+
+
+class Instrument:
+    """ Base class of the simulated instruments. [handle] gets one command line and returns the answer lines.
+        Fault injection: [drop] probability of not answering, [garble] probability of a corrupted answer and [stall] probability of an extra delay of [stall_time] s. """
+
+    Terminator = '\r\n'
+    Echo = False
+
+    def __init__(self, n_channels=1, latency=.005, jitter=.001, drop=0., garble=0., stall=0., stall_time=1., **channel_args):
+        self.Channels = [Channel(**channel_args) for _ in range(n_channels)]
+        self.Latency = latency
+        self.Jitter = jitter
+        self.Drop, self.Garble, self.Stall, self.StallTime = drop, garble, stall, stall_time
+        self.NCommands = 0
+        self.NFaults = 0
+        self.NErrors = 0
+
+    def handle(self, line):
+        """:returns: list of answer lines to the command [line]."""
+        return []
+
+    def get_delay(self):
+        delay = max(0., gauss(self.Latency, self.Jitter))
+        if random() < self.Stall:
+            self.NFaults += 1
+            delay += self.StallTime
+        return delay
+
+    def respond(self, line):
+        """:returns: answer lines after fault injection."""
+        self.NCommands += 1
+        try:
+            answers = ([line] if self.Echo else []) + self.handle(line)
+        except (ValueError, IndexError):  # invalid parameter, the real devices only set an error bit
+            self.NErrors += 1
+            answers = [line] if self.Echo else []
+        if answers and random() < self.Drop:
+            self.NFaults += 1
+            return [line] if self.Echo else []
+        if answers and random() < self.Garble:
+            self.NFaults += 1
+            answers[-1] = choice([answers[-1][:len(answers[-1]) // 2], answers[-1][::-1], '\x13\x11?'])
+        return answers
+
+
+class ISEGSim(Instrument):
+    """ iseg NHS multi channel module: echoes every command, answers the queries of a chain separated by semicolons with one line, ramps in hardware. """
+
+    Echo = True
+
+    def __init__(self, n_channels=6, nominal=2000., model='NHS 6220x', **kwargs):
+        kwargs.setdefault('slew', 10.)
+        Instrument.__init__(self, n_channels, **kwargs)
+        self.Nominal = nominal
+        self.Model = model
+        self.Average = 64
+        self.Kill = 0
+
+    def get_channels(self, arg):
+        match = re.search(r'\(@([0-9,\-]+)\)', arg)
+        if match is None:
+            return list(range(len(self.Channels)))
+        channels = []
+        for part in match.group(1).split(','):
+            first, last = (part.split('-') + [part])[:2]
+            channels += list(range(int(first), int(last) + 1))
+        return [ch for ch in channels if ch < len(self.Channels)]
+
+    def handle(self, line):
+        answers = [self.execute(cmd.strip()) for cmd in line.split(';')]
+        answers = [a for a in answers if a is not None]
+        return [';'.join(answers)] if answers else []
+
+    def status_word(self, ch):
+        c = self.Channels[ch]
+        c.update()
+        return (c.Voltage >= 0) | (c.On << 3) | (c.is_ramping << 4) | (c.EmergencyOff << 5) | (1 << 7) | (c.in_compliance << 14) | (c.Tripped << 13)
+
+    def execute(self, cmd):
+        name = cmd.split('(')[0].split()[0].upper() if cmd else ''
+        arg = cmd[len(cmd.split()[0]):].strip() if cmd else ''
+        channels = self.get_channels(cmd)
+        fmt = lambda values, unit: ','.join('{:.5E}{}'.format(v, unit) for v in values)  # noqa
+        if name == '*IDN?':
+            return 'iseg Spezialelektronik GmbH,{},5200046,5.14'.format(self.Model)
+        if name in ['*RST', '*CLS']:
+            if name == '*RST':
+                for c in self.Channels:
+                    c.On, c.SetVoltage = False, 0.
+            return None
+        if name.startswith(':MEAS:VOLT?') or name.startswith(':READ:VOLT?'):
+            return fmt([(self.Channels[ch].update() or self.Channels[ch].Voltage) if 'MEAS' in name else self.Channels[ch].SetVoltage for ch in channels], 'V')
+        if name.startswith(':MEAS:CURR?') or name.startswith(':READ:CURR?'):
+            return fmt([self.Channels[ch].current for ch in channels], 'A')
+        if name.startswith(':READ:CHAN:STAT?'):
+            return ','.join(str(self.status_word(ch)) for ch in channels)
+        if name.startswith(':READ:CHAN:CONT?'):
+            return ','.join(str((self.Channels[ch].On << 3) | (self.Channels[ch].EmergencyOff << 5)) for ch in channels)
+        if name.startswith(':READ:CHAN:EV') or name.startswith(':READ:MOD'):
+            return ','.join('0' for _ in channels) if 'CHAN' in name else '0'
+        if name == ':CONF:AVER?':
+            return str(self.Average)
+        if name == ':CONF:KILL?':
+            return str(self.Kill)
+        if name.startswith(':READ:RAMP:VOLT?'):
+            return fmt([self.Channels[ch].Slew / self.Nominal * 100 for ch in channels], '%/s')
+        if name.endswith('?'):
+            return '?'
+        if name == ':VOLT':
+            value = arg.split(',')[0].strip().upper()
+            for ch in channels:
+                c = self.Channels[ch]
+                c.update()
+                if value == 'ON':
+                    c.On, c.Tripped = True, False
+                elif value == 'OFF':
+                    c.On = False
+                elif value.startswith('EMCY'):
+                    c.EmergencyOff = 'OFF' in arg.upper()
+                else:
+                    c.SetVoltage = float(value)
+        elif name == ':CONF:RAMP:VOLT':
+            for c in self.Channels:
+                c.update()
+                c.Slew = float(arg.split(',')[0]) * self.Nominal / 100
+        elif name == ':CONF:AVER':
+            self.Average = int(arg)
+        elif name == ':CONF:KILL':
+            self.Kill = int(arg.upper() in ['1', 'ENABLE'])
+        return None
+
+
+class Keithley24XXSim(Instrument):
+    """ Keithley 2400/2410 source meter (SCPI): only queries are answered. Supports the readings of :READ? with the configured :FORM:ELEM
+        and the trace buffer (:TRAC:POIN, :TRIG:COUN, :INIT, :TRAC:DATA?) with samples taken every [NPLC] line cycles. """
+
+    def __init__(self, model=2410, line_frequency=50, **kwargs):
+        Instrument.__init__(self, 1, **kwargs)
+        self.Model = model
+        self.LineFrequency = line_frequency
+        self.Elements = ['VOLT', 'CURR', 'RES', 'TIME', 'STAT']
+        self.NPLC = 1.
+        self.TriggerCount = 1
+        self.BufferSize = 0
+        self.T0 = time()
+        self.BlockStart = None
+
+    @property
+    def channel(self):
+        return self.Channels[0]
+
+    def identify(self):
+        return 'KEITHLEY INSTRUMENTS INC.,MODEL {},4090615,C33   Mar 31 2015 09:32:39/A02  /S/K'.format(self.Model)
+
+    def reading(self, t=None):
+        c = self.channel
+        i = c.current
+        values = {'VOLT': c.Voltage, 'CURR': i, 'RES': 9.91e37, 'TIME': (time() if t is None else t) - self.T0, 'STAT': (c.On << 1) | (c.in_compliance << 3),
+                  'READ': i, 'VSO': c.Voltage}
+        return [values[e] for e in self.Elements]
+
+    def read_buffer(self):
+        if self.BlockStart is None:
+            return ''
+        dt = 3 * self.NPLC / self.LineFrequency
+        n = min(self.BufferSize, int((time() - self.BlockStart) / dt))
+        return ','.join('{:+.6E}'.format(v) for i in range(n) for v in self.reading(self.BlockStart + (i + 1) * dt))
+
+    def handle(self, line):
+        cmd = line.strip()
+        name, arg = (cmd.split(None, 1) + [''])[:2]
+        name = name.upper()
+        c = self.channel
+        if name == '*IDN?':
+            return [self.identify()]
+        if name in [':READ?', ':MEAS?']:
+            return [','.join('{:+.6E}'.format(v) for _ in range(self.TriggerCount) for v in self.reading())]
+        if name == ':OUTP?':
+            return [str(int(c.On))]
+        if name == ':SYST:LFR?':
+            return [str(self.LineFrequency)]
+        if name == ':TRIG:COUN?':
+            return [str(self.TriggerCount)]
+        if name == ':TRAC:DATA?':
+            return [self.read_buffer()]
+        if name.endswith('?'):
+            return ['0']
+        if name == ':OUTP':
+            c.update()
+            c.On = arg.upper() in ['ON', '1']
+        elif name in [':SOUR:VOLT', 'SOUR:VOLT:IMM:AMPL', 'SOUR:VOLT:LEV:IMM:AMPL']:
+            c.update()
+            c.SetVoltage = float(arg)
+        elif name == ':FORM:ELEM':
+            self.Elements = [e.strip().upper() for e in arg.split(',')]
+        elif name == ':SENS:CURR:NPLC':
+            self.NPLC = float(arg)
+        elif name == ':TRIG:COUN':
+            self.TriggerCount = int(float(arg))
+        elif name == ':TRAC:POIN':
+            self.BufferSize = int(float(arg))
+        elif name == ':CURR:PROT:LEV':
+            c.Compliance = float(arg)
+        elif name == ':SYST:TIME:RES':
+            self.T0 = time()
+        elif name == ':INIT':
+            self.BlockStart = time()
+        elif name == '*RST':
+            c.On, c.SetVoltage = False, 0.
+        return []
+
+
+class Keithley6517BSim(Keithley24XXSim):
+    """ Keithley 6517B electrometer: readings in the fixed order READ, VSO. """
+
+    def __init__(self, **kwargs):
+        Keithley24XXSim.__init__(self, model='6517B', **kwargs)
+        self.Elements = ['READ', 'VSO']
+
+    def handle(self, line):
+        answers = Keithley24XXSim.handle(self, line)
+        if line.strip().upper().startswith(':FORM:ELEM'):
+            self.Elements = sorted(self.Elements, key=lambda e: ['READ', 'TST', 'RNUM', 'UNIT', 'VSO'].index(e) if e in ['READ', 'TST', 'RNUM', 'UNIT', 'VSO'] else 9)
+        return answers
+
+
+class Keithley23XSim(Instrument):
+    """ Keithley 236/237/238 behind a Prologix GPIB-USB adapter in auto read mode: '++' lines configure the adapter, device commands are executed
+        with 'X' and every execution returns the data string (or the status selected with U<n>). """
+
+    def __init__(self, model=237, **kwargs):
+        Instrument.__init__(self, 1, **kwargs)
+        self.Model = model
+        self.Status = None
+
+    def data_string(self):
+        c = self.Channels[0]
+        i = c.current
+        return 'NSDCV{:+.4E},D{:+.4E},{}MDCI{:+.4E},T{:+.4E},B0000'.format(c.Voltage, 0, 'O' if c.in_compliance else 'N', i, time() % 1e5)
+
+    def status_string(self, n):
+        if n == 0:
+            return '{}A06'.format(self.Model)
+        if n == 3:
+            return 'MSTG15,0,0K0M000,0N{}R1T4,0,0,0V1Y0'.format(int(self.Channels[0].On))
+        if n == 5:
+            return 'ICP{:+.3E}'.format(self.Channels[0].Compliance)
+        return {1: 'ERS00000000000000000000000000', 9: 'WRS0000000000'}.get(n, '')
+
+    def handle(self, line):
+        line = line.strip()
+        if line.startswith('++'):
+            return []
+        c = self.Channels[0]
+        answer = None
+        for cmd in [part for part in line.split('X') if part]:
+            c.update()
+            if cmd[0] == 'N':
+                c.On = cmd[1:2] == '1'
+            elif cmd[0] == 'B':
+                c.SetVoltage = float(cmd[1:].split(',')[0])
+            elif cmd[0] == 'L':
+                c.Compliance = float(cmd[1:].split(',')[0])
+            elif cmd[0] == 'U':
+                answer = self.status_string(int(cmd[1:]))
+        return [answer if answer is not None else self.data_string()]
+
+
+Models = {'NHS-6220x': ISEGSim, 'NHS-6220n': ISEGSim, '2400': lambda **kw: Keithley24XXSim(2400, **kw), '2410': Keithley24XXSim,
+          '236': lambda **kw: Keithley23XSim(236, **kw), '237': Keithley23XSim, '238': lambda **kw: Keithley23XSim(238, **kw), '6517B': Keithley6517BSim}
+
+
+class PtyEndpoint(Thread):
+    """ Serves the [instrument] on a pseudo terminal, the drivers open [port] like a real serial port. The time to transmit the answer at [baudrate] is simulated. """
+
+    def __init__(self, instrument, baudrate=9600, link=None):
+        Thread.__init__(self, name=type(instrument).__name__, daemon=True)
+        self.Instrument = instrument
+        self.ByteTime = 10. / baudrate if baudrate else 0.
+        self.Master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.Slave = slave
+        self.Port = os.ttyname(slave)
+        self.Link = link
+        if link is not None:
+            if islink(link):
+                os.unlink(link)
+            os.symlink(self.Port, link)
+        self.IsKilled = False
+        self.start()
+
+    def run(self):
+        buf = b''
+        term = self.Instrument.Terminator.encode()
+        while not self.IsKilled:
+            try:
+                buf += os.read(self.Master, 4096)
+            except OSError:
+                return
+            while term in buf:
+                line, buf = buf.split(term, 1)
+                answers = self.Instrument.respond(line.decode(errors='replace'))
+                if answers:
+                    data = ''.join(a + self.Instrument.Terminator for a in answers).encode()
+                    sleep(self.Instrument.get_delay() + self.ByteTime * len(data))
+                    os.write(self.Master, data)
+
+    def close(self):
+        self.IsKilled = True
+        os.close(self.Master)
+        os.close(self.Slave)
+        if self.Link is not None and islink(self.Link):
+            os.unlink(self.Link)
+
+
+def start(model, **kwargs):
+    """:returns: pty endpoint serving a simulated instrument of the [model] (model names like in the config)."""
+    baudrate, link = kwargs.pop('baudrate', 9600), kwargs.pop('link', None)
+    return PtyEndpoint(Models[str(model)](**kwargs), baudrate, link)
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='serve simulated HV devices on pseudo terminals, use the printed ports (or links) as address in the config')
+    parser.add_argument('models', nargs='+', help='models: {}'.format(', '.join(Models)))
+    parser.add_argument('--link', '-l', nargs='*', default=[], help='create symbolic links with these names to the ports (e.g. /tmp/iseg)')
+    parser.add_argument('--latency', type=float, default=.005, help='mean response time in s')
+    parser.add_argument('--jitter', type=float, default=.001, help='standard deviation of the response time in s')
+    parser.add_argument('--baudrate', type=int, default=9600, help='simulated transmission rate, 0 = instant')
+    parser.add_argument('--drop', type=float, default=0., help='probability that a query is not answered')
+    parser.add_argument('--garble', type=float, default=0., help='probability of a corrupted answer')
+    parser.add_argument('--stall', type=float, default=0., help='probability of an additional delay of 1 s')
+    args = parser.parse_args()
+
+    endpoints = []
+    for i, m in enumerate(args.models):
+        lnk = args.link[i] if i < len(args.link) else None
+        if lnk is not None and exists(lnk) and not islink(lnk):
+            parser.error('{} exists and is not a link'.format(lnk))
+        endpoints.append(start(m, baudrate=args.baudrate, link=lnk, latency=args.latency, jitter=args.jitter, drop=args.drop, garble=args.garble, stall=args.stall))
+        print('{:<10} {}{}'.format(m, endpoints[-1].Port, ' -> {}'.format(lnk) if lnk else ''))
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        for e in endpoints:
+            e.close()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Adaptive command timing of the serial devices of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from json import load, dump
+from os.path import join, dirname, realpath, isfile
+from threading import Lock
+from time import perf_counter, sleep, time
+from HVClient.src.histogram import Histogram
+from HVClient.src.utils import ensure_dir, warning
+
+
+class CommandTiming:
+    """ Minimum gap between two commands of a device model and latency histograms of the queries.
+        The gap starts at zero, is doubled whenever the device does not answer and slowly shrinks again while all answers arrive. The learned gaps are stored in data/timing.json. """
+
+    FileName = join(dirname(dirname(realpath(__file__))), 'data', 'timing.json')
+    FileLock = Lock()
+    MinGap, MaxGap = .001, .5
+    Shrink, NShrink = .9, 20  # multiply the gap by [Shrink] after [NShrink] good answers in a row
+    SaveInterval = 60
+    MinTimeout, TimeoutFactor, NTimeout = .05, 5, 20  # read deadline: [TimeoutFactor] x the 99% latency of the query, at least [MinTimeout], after [NTimeout] answers
+
+    def __init__(self, model):
+        self.Model = str(model)
+        self.Gap = self.load().get(self.Model, 0.)
+        self.SavedGap = self.Gap
+        self.LastSave = time()
+        self.LastCommand = 0.
+        self.NGood = 0
+        self.Histograms = {}  # query -> latency histogram
+
+    # ----------------------------------------
+    # region GAP
+    def get_delay(self):
+        """:returns: time until the minimum gap since the last command has passed."""
+        return max(0., self.Gap - (perf_counter() - self.LastCommand))
+
+    def wait(self):
+        dt = self.get_delay()
+        if dt > 0:
+            sleep(dt)
+
+    def sent(self):
+        self.LastCommand = perf_counter()
+
+    def good(self):
+        self.NGood += 1
+        if self.NGood >= CommandTiming.NShrink and self.Gap > 0:
+            self.Gap = 0. if self.Gap * CommandTiming.Shrink < CommandTiming.MinGap else self.Gap * CommandTiming.Shrink
+            self.NGood = 0
+            self.save()
+
+    def bad(self):
+        self.NGood = 0
+        self.Gap = min(max(2 * self.Gap, CommandTiming.MinGap), CommandTiming.MaxGap)
+        warning('No answer from {}, increasing the command gap to {:.1f} ms'.format(self.Model, 1000 * self.Gap))
+        self.save()
+    # endregion GAP
+    # ----------------------------------------
+
+    # ----------------------------------------
+    # region LATENCY
+    def add(self, query, latency, answered=True):
+        """Record the [latency] in seconds of the [query] and adapt the gap."""
+        name = self.get_name(query)
+        if name not in self.Histograms:
+            self.Histograms[name] = Histogram()
+        self.Histograms[name].add(latency)
+        self.good() if answered else self.bad()
+
+    @staticmethod
+    def get_name(query):
+        return query.split()[0].split('(')[0] if query.strip() else query
+
+    def get_timeout(self, query, default):
+        """:returns: time in seconds to wait for the answer to the [query], derived from its latency and at most [default] (also used until the latency is known)."""
+        h = self.Histograms.get(self.get_name(query))
+        if h is None or h.N < CommandTiming.NTimeout:
+            return default
+        return min(default, max(CommandTiming.MinTimeout, CommandTiming.TimeoutFactor * h.quantile(.99)))
+
+    def get_stats(self):
+        """:returns: number of queries, median and 99% quantile (upper bin edges in seconds) per query."""
+        return {name: {'n': h.N, 'median': h.quantile(.5), 'p99': h.quantile(.99)} for name, h in self.Histograms.items()}
+    # endregion LATENCY
+    # ----------------------------------------
+
+    # ----------------------------------------
+    # region PERSISTENCE
+    @staticmethod
+    def load():
+        with CommandTiming.FileLock:
+            if isfile(CommandTiming.FileName):
+                try:
+                    with open(CommandTiming.FileName) as f:
+                        return load(f)
+                except ValueError:
+                    warning('Could not read {}'.format(CommandTiming.FileName))
+            return {}
+
+    def save(self, force=False):
+        if self.Gap == self.SavedGap or not force and time() - self.LastSave < CommandTiming.SaveInterval and self.Gap < self.SavedGap:
+            return  # save increases immediately and decreases at most every [SaveInterval] seconds
+        gaps = self.load()
+        gaps[self.Model] = self.Gap
+        with CommandTiming.FileLock:
+            ensure_dir(dirname(CommandTiming.FileName))
+            with open(CommandTiming.FileName, 'w') as f:
+                dump(gaps, f, indent=2, sort_keys=True)
+        self.SavedGap, self.LastSave = self.Gap, time()
+    # endregion PERSISTENCE
+    # ----------------------------------------
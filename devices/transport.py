@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Buffered line transport for the serial devices of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from time import time
+from HVClient.src.utils import warning
+
+
+class LineTransport:
+    """ Line based communication over a pyserial port. Everything that is waiting is read at once into a buffer which is split at the [terminator].
+        Reads block until the terminator arrives or the deadline has passed, there is no polling with fixed sleeps. """
+
+    Block = .05  # maximum time of a single blocking read, so that the deadlines are kept
+
+    def __init__(self, port, terminator='\r\n', timeout=1.):
+        self.Port = port
+        if port.timeout is None or port.timeout > LineTransport.Block:
+            port.timeout = LineTransport.Block
+        self.Terminator = terminator.encode() if isinstance(terminator, str) else terminator
+        self.Timeout = timeout
+        self.Buffer = bytearray()
+
+    def write(self, data):
+        """Send [data] (the terminator is appended if missing). :returns: True if all bytes were written."""
+        data = data.encode() if isinstance(data, str) else data
+        data += b'' if data.endswith(self.Terminator) else self.Terminator
+        return self.Port.write(data) == len(data)
+
+    def fill(self):
+        """Read all waiting bytes, block until at least one byte arrives (at most [Block] seconds). :returns: number of bytes read"""
+        data = self.Port.read(max(1, self.Port.in_waiting))
+        self.Buffer += data
+        return len(data)
+
+    def read_line(self, timeout=None):
+        """:returns: next line without the terminator or None if it did not arrive within [timeout] seconds (default: self.Timeout)."""
+        deadline = time() + (self.Timeout if timeout is None else timeout)
+        while True:
+            i = self.Buffer.find(self.Terminator)
+            if i >= 0:
+                line = bytes(self.Buffer[:i])
+                del self.Buffer[:i + len(self.Terminator)]
+                return line.decode(errors='replace')
+            if time() > deadline:
+                return None
+            self.fill()
+
+    def read_lines(self, timeout=None, idle=.1):
+        """:returns: all lines which arrive until there is no new line for [idle] seconds, waits at most [timeout] seconds for the first one."""
+        lines = []
+        line = self.read_line(timeout)
+        while line is not None:
+            lines.append(line)
+            line = self.read_line(idle)
+        return lines
+
+    def query(self, data, timeout=None):
+        self.write(data)
+        line = self.read_line(timeout)
+        if line is None:
+            warning('No answer to "{}" within {:.1f} s, received: "{}"'.format(data.strip(), self.Timeout if timeout is None else timeout, self.Buffer.decode(errors='replace')))
+        return line
+
+    def clear(self):
+        """Discard everything in the buffer and the input queue of the port. :returns: the discarded text"""
+        n = self.Port.in_waiting
+        data = bytes(self.Buffer) + (self.Port.read(n) if n else b'')
+        self.Buffer.clear()
+        return data.decode(errors='replace')
+
+    @property
+    def in_waiting(self):
+        return len(self.Buffer) + self.Port.in_waiting
@@ -4,7 +4,7 @@
 # created on September 17th 2020 by M. Reichmann (remichae@phys.ethz.ch)
 # --------------------------------------------------------
 
-from HVClient.src.gui import *
+from argparse import ArgumentParser
 
 parser = ArgumentParser()
 parser.add_argument('--config', '-c', help='Config file', default='main')
@@ -12,6 +12,8 @@ parser.add_argument('--restart', '-R', action='store_true', help='restart hv dev
 parser.add_argument('--test', '-t', action='store_true', help='start test environment')
 args = parser.parse_args()
 
+from HVClient.src.gui import *  # noqa: E402, load the GUI stack only after parsing the arguments (fast --help)
+
 
 app = QApplication(['High Voltage Client'])
 app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Script to start the headless HV acquisition daemon
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from argparse import ArgumentParser
+
+parser = ArgumentParser(description='polls, logs and ramps all active HV devices without GUI, stop it with SIGTERM or Ctrl+C')
+parser.add_argument('--config', '-c', help='Config file', default='main')
+parser.add_argument('--restart', '-R', action='store_true', help='restart hv devices (turn all OFF and set voltage to 0)')
+parser.add_argument('--ramp-down', '-d', action='store_true', help='ramp down all channels before exiting')
+parser.add_argument('--state-file', '-s', help='json file with the state of the devices [default: data/hv_daemon.json]', default=None)
+args = parser.parse_args()
+
+from HVClient.src.daemon import Daemon  # noqa: E402
+
+Daemon(args.config, not args.restart, args.ramp_down, args.state_file).run()
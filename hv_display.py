@@ -4,13 +4,15 @@
 # created on September 17th 2020 by M. Reichmann (remichae@phys.ethz.ch)
 # --------------------------------------------------------
 
-from HVClient.src.gui import *
+from argparse import ArgumentParser
 
 parser = ArgumentParser()
 parser.add_argument('--config', '-c', help='Config file (name without .cfg)', default='main')
 parser.add_argument('--start_time', '-s', nargs='?', help='set start time', default='now')
 args = parser.parse_args()
 
+from HVClient.src.gui import *  # noqa: E402, load the GUI stack only after parsing the arguments (fast --help)
+
 app = QApplication(['High Voltage Display'])
 filterwarnings('ignore')
 
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Asyncio acquisition engine of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Lock
+from atexit import register
+from HVClient.src.utils import warning, info
+
+
+class AsyncLineTransport:
+    """ Non-blocking counterpart of the LineTransport. It shares the buffer of the [transport] and only watches the file descriptor of the port
+        while a transaction is running, so the blocking calls from other threads (GUI) still work in between. """
+
+    def __init__(self, transport, loop):
+        self.Transport = transport
+        self.Loop = loop
+        self.Event = None
+
+    def on_readable(self):
+        port = self.Transport.Port
+        n = port.in_waiting
+        if n:
+            self.Transport.Buffer += port.read(n)
+        self.Event.set()
+
+    async def read_line(self, timeout=None):
+        """:returns: next line without the terminator or None if it did not arrive within [timeout] seconds."""
+        t = self.Transport
+        deadline = self.Loop.time() + (t.Timeout if timeout is None else timeout)
+        self.Event = asyncio.Event()
+        fd = t.Port.fileno()
+        self.Loop.add_reader(fd, self.on_readable)
+        try:
+            while True:
+                i = t.Buffer.find(t.Terminator)
+                if i >= 0:
+                    line = bytes(t.Buffer[:i])
+                    del t.Buffer[:i + len(t.Terminator)]
+                    return line.decode(errors='replace')
+                remaining = deadline - self.Loop.time()
+                if remaining <= 0:
+                    return None
+                self.Event.clear()
+                try:
+                    await asyncio.wait_for(self.Event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+        finally:
+            self.Loop.remove_reader(fd)
+
+    async def write(self, data):
+        return self.Transport.write(data)
+
+
+class AsyncEngine(Thread):
+    """ One event loop (in one thread) which polls all devices with their own period. Drivers with [AsyncPoll] talk to the device with coroutines,
+        all others run their blocking update in a small shared thread pool. Ramping and logging are part of the poll coroutine of each device. """
+
+    Instance = None
+    InstanceLock = Lock()
+
+    def __init__(self, n_workers=4):
+        Thread.__init__(self, name='AsyncEngine', daemon=True)
+        self.Loop = asyncio.new_event_loop()
+        self.Pool = ThreadPoolExecutor(n_workers)
+        self.Tasks = {}
+
+    @staticmethod
+    def get(config):
+        """:returns: the shared engine if it is enabled in the [Devices] section of the [config] (otherwise None)."""
+        if config.get_value('engine', section='Devices', default='thread') != 'async':
+            return None
+        with AsyncEngine.InstanceLock:
+            if AsyncEngine.Instance is None:
+                AsyncEngine.Instance = AsyncEngine(config.get_value('workers', int, 'Devices', default=4))
+                AsyncEngine.Instance.start()
+                register(AsyncEngine.Instance.stop)
+            return AsyncEngine.Instance
+
+    def run(self):
+        asyncio.set_event_loop(self.Loop)
+        self.Loop.run_forever()
+
+    def add(self, device):
+        """Start polling the [device] (thread safe)."""
+        info('Polling {} in the async engine'.format(device.Config.Section))
+        asyncio.run_coroutine_threadsafe(self.start_device(device), self.Loop).result()
+
+    async def start_device(self, device):
+        if device.AsyncPoll and device.Transport is not None and hasattr(device.Transport.Port, 'fileno'):
+            device.AsyncTransport = AsyncLineTransport(device.Transport, self.Loop)
+        self.Tasks[device] = asyncio.ensure_future(self.poll(device))
+
+    async def poll(self, device):
+        while not device.IsKilled:
+            await asyncio.sleep(device.Scheduler.get_delay(device.get_poll_period()))
+            device.Scheduler.start()
+            if not device.IsManual:
+                if device.FromLogs:
+                    await self.Loop.run_in_executor(self.Pool, device.update)  # reads the log files
+                else:
+                    await self.update(device)
+                    await self.write_logs(device)
+                    await self.ramp(device)
+            device.Scheduler.done()
+
+    async def update(self, device):
+        if device.AsyncTransport is None or not device.uses_async_poll():
+            return await self.Loop.run_in_executor(self.Pool, device.update_voltage_current)
+        if not device.IOLock.try_acquire():  # the device is busy with a call from another thread, try again in the next cycle
+            return
+        try:
+            await device.async_update_iv()
+        except Exception as err:
+            device.NReadFailures += 1
+            warning('Could not update voltage/current: {} {}'.format(type(err), err))
+        finally:
+            device.IOLock.release()
+
+    async def write_logs(self, device):
+        if any(logger.Writer is None for logger in device.Logger):  # no log writer thread ([Data] async = False), the files are written directly
+            return await self.Loop.run_in_executor(self.Pool, device.write_logs)
+        device.write_logs()  # only queues the entries for the log writer thread
+
+    async def ramp(self, device):
+        if device.CanRamp or any(device.is_ramping(channel) or device.IsPoweringDown[channel] for channel in device.ActiveChannels):
+            await self.Loop.run_in_executor(self.Pool, device.ramp)
+
+    def wait(self, device, timeout=None):
+        """Block until the poll coroutine of the [device] has ended (thread safe)."""
+        task = self.Tasks.get(device)
+        if task is not None and self.Loop.is_running():
+            asyncio.run_coroutine_threadsafe(asyncio.wait([task], timeout=timeout), self.Loop).result()
+
+    def stop(self):
+        if self.Loop.is_running():
+            self.Loop.call_soon_threadsafe(self.Loop.stop)
+        self.Pool.shutdown(wait=False)
+
+    def get_stats(self):
+        return {device.Config.Section: not task.done() for device, task in self.Tasks.items()}
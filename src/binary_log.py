@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Binary columnar log files for the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from os.path import getsize, splitext
+from struct import Struct
+from numpy import dtype, memmap, concatenate, zeros
+
+
+RecordType = dtype([('time', '<f8'), ('bias', '<f4'), ('current', '<f8'), ('status', 'u1'), ('ramping', 'u1')])
+Record = Struct('<dfdBB')  # same layout as RecordType, packed without numpy overhead
+
+
+class BinaryLog:
+    """Append-only log with one fixed-width record per sample. The files live next to the text logs (same name, different extension) and can be read with numpy.memmap."""
+
+    Ext = '.bin'
+
+    def __init__(self, log_file):
+        self.FileName = self.make_file_name(log_file)
+        self.File = open(self.FileName, 'ab')
+
+    @staticmethod
+    def make_file_name(log_file):
+        return '{}{}'.format(splitext(log_file)[0], BinaryLog.Ext)
+
+    def write(self, t, bias, current, status, is_ramping):
+        self.File.write(Record.pack(t, bias, current, bool(status), bool(is_ramping)))
+
+    def close(self):
+        self.File.close()
+
+
+def load_binary_log(filename):
+    """:returns: read-only memmap of all complete records in the file."""
+    n = getsize(filename) // RecordType.itemsize
+    return memmap(filename, RecordType, 'r', shape=(n,)) if n else zeros(0, RecordType)
+
+
+def load_binary_logs(files, start=0):
+    """:returns: records of all [files] (sorted in time) after the epoch time [start]."""
+    data = [load_binary_log(f) for f in files]
+    data = [d[d['time'].searchsorted(start, side='right'):] for d in data if d.size and d['time'][-1] > start]
+    return concatenate(data) if data else zeros(0, RecordType)
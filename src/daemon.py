@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Headless acquisition daemon of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import signal
+from json import dump
+from os import getpid, replace
+from os.path import join, dirname, realpath
+from threading import Event
+from time import time, sleep
+from HVClient.src.device_reader import get_devices
+from HVClient.src.io_lock import IOTimeout
+from HVClient.src.log_writer import LogWriter
+from HVClient.src.rpc import start_server
+from HVClient.src.metrics import start_metrics
+from HVClient.src.config import Config
+from HVClient.src.utils import info, warning, ensure_dir, choose
+
+
+class Daemon:
+    """ Runs the acquisition (polling, logging and ramping) of all active devices without any GUI and publishes the state of the devices in a json file.
+        SIGTERM/SIGINT stop it ramp-safe: running ramps are finished (or all channels are ramped down with [ramp_down]) before the threads are stopped
+        and the logs are flushed. A second signal skips the waiting for the ramps. """
+
+    Dir = dirname(dirname(realpath(__file__)))
+
+    def __init__(self, config='main', hot_start=True, ramp_down=False, state_file=None):
+        self.Config = Config(config)
+        self.StateFile = choose(state_file, join(Daemon.Dir, 'data', 'hv_daemon.json'))
+        self.StateInterval = self.Config.get_value('state interval', float, 'Daemon', default=1.)
+        self.ShutdownTimeout = self.Config.get_value('shutdown timeout', float, 'Daemon', default=600.)
+        self.RampDown = ramp_down
+        self.StartTime = time()
+
+        self.Stopped = Event()
+        self.IsForced = False
+        signal.signal(signal.SIGTERM, self.on_signal)
+        signal.signal(signal.SIGINT, self.on_signal)
+
+        self.Devices = get_devices(config, hot_start)
+        self.RPC = None
+        self.Metrics = None
+
+    def on_signal(self, signum, frame):
+        if self.Stopped.is_set():
+            warning('Received {} again, not waiting for the ramps'.format(signal.Signals(signum).name))
+            self.IsForced = True
+        else:
+            info('Received {}, shutting down'.format(signal.Signals(signum).name))
+            self.Stopped.set()
+
+    def run(self):
+        for device in self.Devices:
+            device.start()
+        self.RPC = start_server(self.Config, self.Devices)
+        self.Metrics = start_metrics(self.Config, self.Devices)
+        info('Acquisition of {} devices running (pid {})'.format(len(self.Devices), getpid()))
+        while not self.Stopped.wait(self.StateInterval):
+            self.write_state()
+        self.shutdown()
+
+    def shutdown(self):
+        if self.RPC is not None:
+            self.RPC.close()
+        if self.Metrics is not None:
+            self.Metrics.close()
+        if self.RampDown:
+            for device in self.Devices:
+                for channel in device.ActiveChannels:
+                    if device.get_status(channel):
+                        device.power_down(channel)
+        self.wait_for_ramps()
+        for device in self.Devices:
+            device.IsKilled = True
+        for device in self.Devices:
+            timeout = 10 * device.get_poll_period() + device.MaxWaitingTime
+            if device.is_alive():
+                device.join(timeout)
+            elif device.Engine is not None:
+                device.Engine.wait(device, timeout)
+        if LogWriter.Instance is not None:
+            LogWriter.Instance.stop()
+        for device in self.Devices:
+            for logger in device.Logger:
+                logger.close()
+        self.write_state(running=False)
+        info('Acquisition stopped')
+
+    def wait_for_ramps(self):
+        """Wait until no channel is ramping or powering down anymore. After the timeout the channels are held at their present voltage."""
+        t = time()
+        while not self.IsForced and time() - t < self.ShutdownTimeout:
+            ramping = [(dev, ch) for dev in self.Devices for ch in dev.ActiveChannels if dev.is_ramping(ch) or dev.IsPoweringDown[ch]]
+            if not ramping:
+                return
+            self.write_state()
+            sleep(self.StateInterval)
+        for dev in self.Devices:
+            for ch in dev.ActiveChannels:
+                if dev.is_ramping(ch) or dev.IsPoweringDown[ch]:
+                    bias = dev.get_set_bias(ch)
+                    warning('{} CH{} still ramping, holding it at {:.1f} V'.format(dev.Config.Section, ch, bias))
+                    dev.IsPoweringDown[ch] = False
+                    dev.set_target_bias(bias, ch)
+                    if dev.CanRamp:  # the device ramps on its own towards the last set voltage, the poll loop stops before it could send the new one
+                        try:
+                            with dev.IOLock:
+                                dev.set_bias(bias, ch)
+                        except IOTimeout as err:
+                            warning('Could not hold {} CH{}: {}'.format(dev.Config.Section, ch, err))
+
+    # ----------------------------------------
+    # region STATE
+    def get_state(self, running=True):
+        return {'pid': getpid(), 'running': running, 'started': self.StartTime, 'updated': time(),
+                'devices': {dev.Config.Section: {'model': dev.Config.get_value('model'), 'poll': dev.get_poll_stats(), 'lock': dev.get_lock_stats(),
+                                                 'channels': {ch: dev.get_channel_state(ch) for ch in dev.ActiveChannels}} for dev in self.Devices}}
+
+    def write_state(self, running=True):
+        """Atomically replace the state file, so readers never see a partial file."""
+        try:
+            ensure_dir(dirname(self.StateFile))
+            tmp = '{}.tmp'.format(self.StateFile)
+            with open(tmp, 'w') as f:
+                dump(self.get_state(running), f, indent=2, default=str)
+            replace(tmp, self.StateFile)
+        except Exception as err:
+            warning('Could not write the state file: {}'.format(err))
+    # endregion STATE
+    # ----------------------------------------
@@ -26,7 +26,7 @@ class DeviceBox(QGroupBox):
             return
 
         # Canvas
-        self.LiveMonitor = LiveMonitor()
+        self.LiveMonitor = LiveMonitor(capacity=self.Device.Config.get_value('display buffer', int, 'Data'))
         self.set_title()
         self.setFont(QFont('Ubuntu', 8, QFont.Bold))
         format_widget(self, color='red')
@@ -7,24 +7,31 @@
 
 import signal
 from argparse import ArgumentParser
+from collections import OrderedDict
+from importlib import import_module
+from threading import Thread, Condition
+from time import perf_counter
 from HVClient.devices.device import *
 from HVClient.devices.dummy import Dummy
-from HVClient.devices.ISEG import ISEG
-from HVClient.devices.Keithley23X import Keithley23X
-from HVClient.devices.Keithley24XX import Keithley24XX
-from HVClient.devices.Keithley2657 import Keithley2657
-from HVClient.devices.Keithley6517B import Keithley6517B
 from HVClient.src.config import Config
 
-device_dic = {'2400': Keithley24XX,
-              '2410': Keithley24XX,
-              '236': Keithley23X,
-              '237': Keithley23X,
-              '238': Keithley23X,
-              '6517B': Keithley6517B,
-              '2657A': Keithley2657,
-              'NHS-6220n': ISEG,
-              'NHS-6220x': ISEG}
+# model -> driver: module in devices/ with a class of the same name, imported only when a device of the model is configured
+device_dic = {'2400': 'Keithley24XX',
+              '2410': 'Keithley24XX',
+              '236': 'Keithley23X',
+              '237': 'Keithley23X',
+              '238': 'Keithley23X',
+              '6517B': 'Keithley6517B',
+              '2657A': 'Keithley2657',
+              'NHS-6220n': 'ISEG',
+              'NHS-6220x': 'ISEG'}
+
+
+def get_driver(model):
+    """:returns: the device class for the [model] (imports the driver module on first use)."""
+    if model not in device_dic:
+        raise ValueError(f'unknown model "{model}", known models: {", ".join(device_dic)}')
+    return getattr(import_module(f'HVClient.devices.{device_dic[model]}'), device_dic[model])
 
 
 def get_devices(config, hot_start, print_logs=False):
@@ -34,6 +41,8 @@ def get_devices(config, hot_start, print_logs=False):
     print(f'Loading HV devices: {device_nrs}')
     print('=======================================')
     print('\n=============INSTANTIATION=============')
+    if c.getboolean('Devices', 'parallel startup', fallback=True):
+        return init_devices(device_nrs, c, hot_start, print_logs)
     return [init_device(nr, c, hot_start, print_logs) for nr in device_nrs]
 
 
@@ -50,12 +59,86 @@ def get_dummies(config):
 def init_device(device_nr, config, hot_start, print_logs=False):
     model = config.get(f'HV{device_nr}', 'model')
     print(f'Instantiating {model}')
-    device = device_dic[model](device_nr, config.MainFile, hot_start, print_logs)
+    device = get_driver(model)(device_nr, config.MainFile, hot_start, print_logs=print_logs)
     print('successfully instantiated {} with model number {}'.format(device.Names, device.Model))
     print('active channels: {}'.format(device.ActiveChannels))
     return device
 
 
+def init_devices(device_nrs, config, hot_start, print_logs=False):
+    """ Instantiate the devices in parallel, one thread per port (devices sharing a port, e.g. a GPIB adapter, are initialised one after another).
+        Devices which fail or do not finish within the 'startup timeout' (per device) are reported and left out, devices which finish too late are closed. """
+    timeout = config.get_value('startup timeout', float, 'Devices', default=60)
+    groups = OrderedDict()
+    results = OrderedDict((nr, None) for nr in device_nrs)  # nr -> (device or exception, duration)
+    for nr in device_nrs:
+        section = f'HV{nr}'
+        try:
+            get_driver(config.get_value('model', section=section))  # import the drivers before starting the threads
+        except Exception as err:
+            results[nr] = (err, 0.)
+            continue
+        groups.setdefault(config.get_value('address', section=section, default=config.get_value('ip_address', section=section, default=section)), []).append(nr)
+
+    lock = Condition()
+    started, late = {}, set()  # nr -> start of the initialisation, devices which were given up
+
+    def init_group(nrs):
+        for nr in nrs:
+            with lock:
+                if nr in late:  # an earlier device at the same address did not finish in time
+                    return
+                started[nr] = perf_counter()
+                lock.notify()
+            try:
+                result = init_device(nr, config, hot_start, print_logs)
+            except Exception as err:
+                result = err
+            with lock:
+                if nr not in late:
+                    results[nr] = (result, perf_counter() - started[nr])
+                    lock.notify()
+                    continue
+            warning(f'HV{nr} finished its initialisation after {perf_counter() - started[nr]:.1f} s, closing it')
+            if not isinstance(result, Exception):
+                result.close()
+            return
+
+    t0 = perf_counter()
+    for address, nrs in groups.items():
+        Thread(target=init_group, args=(nrs,), name=f'init {address}', daemon=True).start()
+    with lock:
+        while True:
+            now = perf_counter()
+            for nrs in groups.values():
+                nr = next((nr for nr in nrs if results[nr] is None), None)  # the one being initialised
+                if nr in started and nr not in late and now > started[nr] + timeout:
+                    late.update(n for n in nrs if results[n] is None)
+            if all(results[nr] is not None or nr in late for nrs in groups.values() for nr in nrs):
+                break
+            lock.wait(min([started[nr] + timeout - now for nr in started if results[nr] is None and nr not in late] + [1.]))
+    total = perf_counter() - t0
+
+    print('\n===============STARTUP=================')
+    devices = []
+    for nr, result in list(results.items()):
+        model = config.get_value('model', section=f'HV{nr}')
+        if result is None and nr not in started:
+            warning(f'HV{nr} ({model}) was not started since an earlier device at the same address did not finish in time')
+        elif result is None:
+            warning(f'HV{nr} ({model}) did not start within {timeout:.0f} s')
+        elif isinstance(result[0], Exception):
+            warning(f'HV{nr} ({model}) failed after {result[1]:.1f} s: {type(result[0]).__name__} {result[0]}')
+        else:
+            devices.append(result[0])
+            print(f'HV{nr} ({model}): {result[1]:5.1f} s')
+    print(f'started {len(devices)}/{len(device_nrs)} devices in {total:.1f} s (sequential {sum(r[1] for r in results.values() if r is not None):.1f} s)')
+    print('=======================================')
+    if not devices and device_nrs:
+        critical('could not start any device')
+    return devices
+
+
 if __name__ == '__main__':
 
     parser = ArgumentParser()
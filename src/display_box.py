@@ -34,8 +34,8 @@ class DisplayBox(DeviceBox):
     def update(self):
         if self.Device is None:
             return
+        self.LiveMonitor.extend(self.Device.get_new_data(self.Channel))
         if self.Device.LastUpdate:
-            self.LiveMonitor.add_data(self.Device.LastUpdate, self.Device.BiasNow[self.Channel], self.Device.CurrentNow[self.Channel], dttime=True)
             self.LiveMonitor.update(self.Units.currentText(), int(self.MinCurrent.text()), int(self.MaxCurrent.text()), int(self.MinVoltage.text()), int(self.MaxVoltage.text()),
                                     t_displayed=str(self.DisplayTimes.currentText()))
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Min/max decimation of the displayed data of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from collections import OrderedDict
+from math import ceil, log2
+from numpy import dtype, zeros, floor, append, flatnonzero, diff, minimum, maximum, concatenate, repeat, column_stack
+
+BucketType = dtype([('id', 'i8'), ('time', 'f8'), ('vmin', 'f8'), ('vmax', 'f8'), ('cmin', 'f8'), ('cmax', 'f8')])
+
+
+class Envelope:
+    """Minimum and maximum of the voltage and current in buckets of fixed width. The complete buckets are kept, only the last one is recalculated."""
+
+    def __init__(self, width):
+        self.Width = width
+        self.Buckets = zeros(0, BucketType)
+        self.Last = zeros(0, BucketType)  # incomplete last bucket
+        self.Start = None
+
+    def extend(self, t, v, c):
+        """Add all samples after the last complete bucket."""
+        if self.Start is None:
+            self.Start = floor(t[0] / self.Width) * self.Width
+        i = t.searchsorted((self.Buckets['id'][-1] + 1) * self.Width) if self.Buckets.size else 0
+        buckets = self.calc(t[i:], v[i:], c[i:])
+        self.Buckets = concatenate([self.Buckets[self.Buckets['time'] >= t[0] - self.Width], buckets[:-1]])  # drop buckets which left the window
+        self.Last = buckets[-1:]
+
+    def calc(self, t, v, c):
+        ids = floor(t / self.Width).astype('i8')
+        starts = append(0, flatnonzero(diff(ids)) + 1)
+        buckets = zeros(starts.size, BucketType)
+        buckets['id'], buckets['time'] = ids[starts], t[starts]
+        buckets['vmin'], buckets['vmax'] = minimum.reduceat(v, starts), maximum.reduceat(v, starts)
+        buckets['cmin'], buckets['cmax'] = minimum.reduceat(c, starts), maximum.reduceat(c, starts)
+        return buckets
+
+    def get(self, t_min):
+        """:returns: time, voltage and current with a vertical min/max segment per bucket."""
+        b = concatenate([self.Buckets, self.Last])
+        b = b[b['time'] >= t_min]
+        return repeat(b['time'], 2), column_stack([b['vmin'], b['vmax']]).ravel(), column_stack([b['cmin'], b['cmax']]).ravel()
+
+
+class Decimator:
+    """Reduces the data to at most two points per pixel. The envelopes are cached per zoom level (bucket width) and extended incrementally."""
+
+    MaxLevels = 8
+
+    def __init__(self):
+        self.Cache = OrderedDict()
+
+    @staticmethod
+    def get_width(span, n_pixels):
+        """:returns: bucket width as power of two, so that it does not change with every shift of the window."""
+        return 2. ** ceil(log2(span / n_pixels)) if span > 0 and n_pixels > 0 else None
+
+    def __call__(self, t, v, c, t_min, t_max, n_pixels):
+        w = self.get_width(t_max - t_min, n_pixels)
+        if t.size <= 2 * n_pixels or w is None:
+            return t, v, c
+        env = self.Cache.pop(w, None)
+        if env is None or t[0] < env.Start:  # not cached or the window was extended
+            env = Envelope(w)
+        self.Cache[w] = env
+        while len(self.Cache) > Decimator.MaxLevels:
+            self.Cache.popitem(last=False)
+        env.extend(t, v, c)
+        return env.get(t_min)
+
+    def clear(self):
+        self.Cache.clear()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Fixed bin histograms for the instrumentation of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from bisect import bisect_left
+
+
+class Histogram:
+    """ Number of values per bin (bin i holds the values in (bins[i], bins[i + 1]], the last bin is open), their count and their sum, like the Prometheus histograms.
+        Adding a value is a bisection and two additions, so it can be used in the poll loops. """
+
+    Bins = [0.] + [10 ** (-4 + i / 5) for i in range(26)]  # 0.1 ms to 10 s
+
+    def __init__(self, bins=None):
+        self.Bins = Histogram.Bins if bins is None else list(bins)
+        self.Counts = [0] * len(self.Bins)
+        self.N = 0
+        self.Sum = 0.
+
+    def add(self, value):
+        self.Counts[max(bisect_left(self.Bins, value) - 1, 0)] += 1
+        self.N += 1
+        self.Sum += value
+
+    def merge(self, other):
+        """Add the counts of the histogram [other] with the same bins."""
+        self.Counts = [a + b for a, b in zip(self.Counts, other.Counts)]
+        self.N += other.N
+        self.Sum += other.Sum
+        return self
+
+    def quantile(self, q):
+        """:returns: upper edge of the bin which contains the [q] quantile (the lower edge for the open bin)."""
+        n = 0
+        for i, count in enumerate(self.Counts):
+            n += count
+            if n and n >= q * self.N:
+                return self.Bins[min(i + 1, len(self.Bins) - 1)]
+        return 0.
+
+    def get_buckets(self):
+        """:returns: list of the upper bin edges and the cumulative counts (Prometheus 'le' buckets)."""
+        counts, n = [], 0
+        for count in self.Counts:
+            n += count
+            counts.append(n)
+        return list(zip(self.Bins[1:] + [float('inf')], counts))
+
+    def get_stats(self):
+        return {'n': self.N, 'mean': self.Sum / self.N if self.N else 0., 'median': self.quantile(.5), 'p99': self.quantile(.99)}
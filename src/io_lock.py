@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Per-device lock for the serial/VISA transactions of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from threading import RLock, Condition
+from time import perf_counter
+from HVClient.src.histogram import Histogram
+
+
+class IOTimeout(Exception):
+    pass
+
+
+class IOLock:
+    """ Re-entrant lock which serialises all transactions (write + read) with one device. It replaces the busy flags which were polled every 100-200 ms.
+        Waiting threads are woken up as soon as the lock is released and the time spent waiting is recorded. """
+
+    def __init__(self, name='', timeout=20):
+        self.Name = name
+        self.Timeout = timeout
+        self.Lock = RLock()
+        self.Updated = Condition(self.Lock)  # notified after every new measurement
+
+        # contention metrics
+        self.NAcquired = 0
+        self.NContended = 0
+        self.NTimeouts = 0
+        self.WaitTime = 0.
+        self.MaxWaitTime = 0.
+        self.WaitHistogram = Histogram()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self, timeout=None):
+        """Wait at most [timeout] seconds (default: self.Timeout) for the lock. :raises: IOTimeout"""
+        if not self.Lock.acquire(blocking=False):
+            t = perf_counter()
+            ok = self.Lock.acquire(timeout=self.Timeout if timeout is None else timeout)
+            wait = perf_counter() - t
+            self.NContended += 1
+            self.WaitTime += wait
+            self.MaxWaitTime = max(self.MaxWaitTime, wait)
+            self.WaitHistogram.add(wait)
+            if not ok:
+                self.NTimeouts += 1
+                raise IOTimeout('{} is busy for more than {:.1f} s'.format(self.Name, wait))
+        self.NAcquired += 1
+        return True
+
+    def try_acquire(self):
+        """:returns: True if the lock was free and is now held, never blocks."""
+        if self.Lock.acquire(blocking=False):
+            self.NAcquired += 1
+            return True
+        self.NContended += 1
+        return False
+
+    def release(self):
+        self.Lock.release()
+
+    def notify_update(self):
+        with self.Lock:
+            self.Updated.notify_all()
+
+    def wait_for_update(self, timeout=None):
+        """Block until the next measurement was read. :returns: False if there was none within [timeout] seconds."""
+        with self.Lock:
+            return self.Updated.wait(self.Timeout if timeout is None else timeout)
+
+    def get_stats(self):
+        return {'acquired': self.NAcquired, 'contended': self.NContended, 'timeouts': self.NTimeouts,
+                'mean wait': self.WaitTime / self.NContended if self.NContended else 0., 'max wait': self.MaxWaitTime}
@@ -3,9 +3,13 @@
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
-from matplotlib.dates import DateFormatter, date2num, num2date
+from matplotlib.dates import DateFormatter, date2num
 from warnings import filterwarnings, catch_warnings
+from time import localtime
+from numpy import asarray, vectorize
 from HVClient.src.utils import *
+from HVClient.src.ring_buffer import RingBuffer
+from HVClient.src.downsampling import Decimator
 
 
 times = OrderedDict([('5min', 5 / 60.), ('10min', 10 / 60.), ('20min', 20 / 60.), ('0.5', .5), ('1', 1), ('2', 2), ('4', 4), ('8', 8), ('inf', 1000)])
@@ -18,7 +22,10 @@ class LiveMonitor(object):
     LW = .3
     FD = {'size': 10}
 
-    def __init__(self, dummy=False):
+    Capacity = 2 ** 19  # maximum number of displayed samples per channel
+    Blit = True  # only redraw the lines if the layout did not change
+
+    def __init__(self, dummy=False, capacity=None):
 
         self.Unit = 'nA'
         self.VMin = -100
@@ -45,20 +52,26 @@ class LiveMonitor(object):
         self.ax2.set_ylabel('Bias Voltage', color=CYAN)
         self.ax2.tick_params('y', colors=CYAN)
 
+        # the lines are created once and only get new data, they are excluded from the full redraw (animated) and blitted on top of the background
+        self.Lines = [self.ax1.plot([], [], '.r', ls='-', animated=True)[0], self.ax2.plot([], [], '.b', ls='-', animated=True)[0]]
+        self.Background = None
+        self.Layout = None
+        self.XMax = None
+
         self.canvas = FigureCanvas(self.fig)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
         self.fig.patch.set_facecolor(BKG)
         self.canvas.draw()
 
-        # these lists hold the data
-        self.time = []
-        self.voltage = []
-        self.current = []
+        # preallocated buffer for the time [date number], voltage and current
+        self.Data = RingBuffer(choose(capacity, LiveMonitor.Capacity))
+        self.Decimator = Decimator()  # min/max envelope with at most two points per pixel for long time windows
 
-    def init(self, lst):
-        for data in lst:
-            self.current.append(data[2])
-            self.voltage.append(data[1])
-            self.time.append(date2num(data[0]))
+    def init(self, data):
+        """ :param data: structured array with the fields time [epoch seconds], bias and current """
+        self.Data.clear()
+        self.Decimator.clear()
+        self.Data.extend(epoch2num(data['time']), data['bias'], data['current'])
 
     def format_dummy(self):
         with catch_warnings():
@@ -71,19 +84,29 @@ class LiveMonitor(object):
             self.fig.patch.set_facecolor(BKG)
 
     def get_duration(self):
-        return num2date(self.time[-1]) - num2date(self.time[0]) if len(self.time) > 1 else timedelta(seconds=1)
+        return timedelta(days=self.Data.last_time() - self.Data.time[0]) if len(self.Data) > 1 else timedelta(seconds=1)
 
     def format(self):
-        if len(self.time) > 2:
+        if len(self.Data) > 2:
             self.ax1.xaxis.set_major_formatter(DateFormatter('%H:%M{}'.format(':%S' if self.get_duration().total_seconds() < 60 * 5 else '')))
             self.ax1.set_xlabel('Time [hh:mm]', color=CYAN, fontdict=LiveMonitor.FD)
             self.ax1.set_facecolor('lightblue')
             self.ax2.set_ylabel('Bias Voltage', color=CYAN, fontdict=LiveMonitor.FD)
             self.ax1.set_ylabel(u'Leakage Current [{}]'.format(self.Unit), color=RED, fontdict=LiveMonitor.FD)
             self.ax2.set_ylim(self.VMin, self.VMax)
-            self.ax1.set_ylim(auto=True) if self.CMin == self.CMax else self.ax1.set_ylim(self.CMin, self.CMax)
-            self.ax1.set_xlim(self.TMin, self.time[-1])
-            self.ax2.set_xlim(self.TMin, self.time[-1])
+            if self.CMin == self.CMax:
+                self.ax1.set_ylim(auto=True)
+                self.ax1.relim()
+                self.ax1.autoscale_view(scalex=False)
+            else:
+                self.ax1.set_ylim(self.CMin, self.CMax)
+            t_max = self.Data.last_time()
+            self.XMax = t_max + max(.1 * (t_max - self.TMin), 1 / 24 / 60)  # leave some space for new data, so that the axes do not change with every update
+            self.ax1.set_xlim(self.TMin, self.XMax)
+            self.ax2.set_xlim(self.TMin, self.XMax)
+            for line in self.Lines:
+                line.set_markersize(LiveMonitor.MS)
+                line.set_linewidth(LiveMonitor.LW)
             self.format_ticks()
             self.fig.subplots_adjust(bottom=.15, right=.85)
             self.ax1.grid(ls='--', lw=.4)
@@ -97,39 +120,70 @@ class LiveMonitor(object):
             tick.set_fontsize(LiveMonitor.FD['size'])
 
     def add_data(self, t, v, i, dttime=False):
-        if v and (not self.time or t != self.time[-1] and v != 0):
-            self.time.append(date2num(datetime.fromtimestamp(t) if not dttime else t))
-            self.voltage.append(float(v))
-            self.current.append(float(i))
+        t = date2num(datetime.fromtimestamp(t) if not dttime else t)
+        if v and (not len(self.Data) or t != self.Data.last_time() and v != 0):
+            self.Data.append(t, float(v), float(i))
+
+    def extend(self, data):
+        """Append all measurements of the structured array [data] which are newer than the last point."""
+        t = epoch2num(data['time'])
+        new = t > self.Data.last_time() if len(self.Data) else t == t
+        self.Data.extend(t[new], data['bias'][new], data['current'][new])
+
+    def on_draw(self, event=None):
+        """Save the background after each full redraw (also after resizing) and draw the lines on top."""
+        self.Background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        self.ax1.draw_artist(self.Lines[0])
+        self.ax2.draw_artist(self.Lines[1])
+
+    def needs_layout(self, layout, t, c):
+        if layout != self.Layout or self.Background is None or not LiveMonitor.Blit or t[-1] > self.XMax:
+            return True
+        c_min, c_max = self.ax1.get_ylim()
+        return self.CMin == self.CMax and (c.min() < c_min or c.max() > c_max)  # auto range
 
     def update(self, unit, cmin, cmax, vmin, vmax, t_displayed):
-        self.Unit = unit
-        self.CMin = cmin
-        self.CMax = cmax
-        self.VMin = vmin
-        self.VMax = vmax
-        self.ax1.cla()
-        self.ax2.cla()
-        if self.time:
-            self.TMin = self.time[0] if t_displayed == 'inf' else date2num(num2date(self.time[-1]) - timedelta(hours=times[t_displayed]))
-        self.format()
-
-        if len(self.time) > 2:
-            try:
-                n_points = len(self.time) - 1  # prevent racing conditions
-
-                self.ax1.plot(self.time[:n_points], [c / units[self.Unit] for c in self.current[:n_points]], '.r', lw=LiveMonitor.LW, ls='-', ms=LiveMonitor.MS)
-                self.ax2.plot(self.time[:n_points], self.voltage[:n_points], '.b', lw=LiveMonitor.LW, ls='-', ms=LiveMonitor.MS)
+        if len(self.Data) <= 2:
+            return
+        try:
+            self.TMin = self.Data.time[0] if t_displayed == 'inf' else self.Data.last_time() - times[t_displayed] / 24
+            t, v, c = self.Data.window(self.TMin)
+            t, v, c = self.Decimator(t, v, c, self.TMin, choose(self.XMax, t[-1]), int(self.ax1.bbox.width))
+            c = c / units[unit]
+            self.Lines[0].set_data(t, c)
+            self.Lines[1].set_data(t, v)
+            layout = (unit, cmin, cmax, vmin, vmax, t_displayed, LiveMonitor.MS, LiveMonitor.LW, tuple(LiveMonitor.FD.items()))
+            if self.needs_layout(layout, t, c):
+                self.Unit, self.CMin, self.CMax, self.VMin, self.VMax = unit, cmin, cmax, vmin, vmax
+                self.Layout = layout
+                self.format()
                 self.canvas.draw()
-            except Exception as err:
-                print(err)
-                pass
+            else:
+                self.canvas.restore_region(self.Background)
+                self.draw_lines()
+                self.canvas.blit(self.fig.bbox)
+        except Exception as err:
+            print(err)
 
     def reset(self):
-        self.time = []
-        self.voltage = []
-        self.current = []
-        self.fig.clf()
+        self.Data.clear()
+        self.Decimator.clear()
+        self.Layout = None
+        for line in self.Lines:
+            line.set_data([], [])
+
+
+def epoch2num(t):
+    """Vectorised version of date2num(datetime.fromtimestamp(t)), i.e. the local time as matplotlib date number."""
+    t = asarray(t, 'd')
+    if not t.size:
+        return t
+    offset = localtime(t[0]).tm_gmtoff
+    offset = offset if offset == localtime(t[-1]).tm_gmtoff else vectorize(lambda x: localtime(x).tm_gmtoff)(t)  # switch of daylight saving time
+    return date2num(datetime(1970, 1, 1)) + (t + offset) / 86400
 
 
 if __name__ == '__main__':
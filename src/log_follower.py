@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Incremental reader for the growing log files of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from os import read, close, stat, O_NONBLOCK, O_CLOEXEC
+from os.path import join, isdir
+from glob import glob
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from numpy import concatenate
+from HVClient.src.log_parser import parse_buffer, parse_logs, get_midnight
+from HVClient.src.logger import Logger
+from HVClient.src.utils import warning
+
+IN_MODIFY, IN_CREATE, IN_MOVED_TO = 0x2, 0x100, 0x80
+
+
+class INotifyWatcher:
+    """Change notification of a directory with the Linux inotify API."""
+
+    def __init__(self, path):
+        libc = CDLL(find_library('c'), use_errno=True)
+        self.FD = libc.inotify_init1(O_NONBLOCK | O_CLOEXEC)
+        if self.FD < 0 or libc.inotify_add_watch(self.FD, path.encode(), IN_MODIFY | IN_CREATE | IN_MOVED_TO) < 0:
+            raise OSError(get_errno(), 'could not watch {}'.format(path))
+
+    def changed(self):
+        events = False
+        while True:  # drain all pending events
+            try:
+                events |= bool(read(self.FD, 4096))
+            except BlockingIOError:
+                return events
+
+    def close(self):
+        close(self.FD)
+
+
+class PollWatcher:
+    """Fallback which compares the modification times of the directory and the current file."""
+
+    def __init__(self, path):
+        self.Path = path
+        self.FileName = None
+        self.Last = None
+
+    def changed(self):
+        try:
+            now = (stat(self.Path).st_mtime_ns, stat(self.FileName).st_size if self.FileName else None)
+        except OSError:
+            return False
+        changed, self.Last = now != self.Last, now
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(path):
+    try:
+        return INotifyWatcher(path)
+    except (OSError, AttributeError):  # no inotify on this platform
+        return PollWatcher(path)
+
+
+class LogFollower:
+    """ Keeps the newest log file of a channel open and returns every record which was appended since the last poll. Switches to the new file at midnight.
+        It starts at the [position] (file name and offset, see get_position) where an earlier read of the logs stopped, otherwise at the end of the newest file. """
+
+    def __init__(self, log_dir, position=None):
+        self.Dir = log_dir
+        self.Watcher = make_watcher(log_dir) if isdir(log_dir) else None
+        self.FileName = None
+        self.File = None
+        self.Midnight = 0
+        self.Buffer = b''
+        self.Pending = position is not None and position[0] is not None  # records may have been appended before the watcher was started
+        if self.Pending:
+            self.open(*position)
+        else:
+            self.open(self.find_latest(), at_end=True)
+
+    @staticmethod
+    def get_position(log_dir):
+        """:returns: the newest log file in [log_dir] and its size (None, 0 if there is none)."""
+        filename = max(glob(join(log_dir, '*.log')), default=None)
+        return (filename, stat(filename).st_size) if filename is not None else (None, 0)
+
+    def find_latest(self):
+        return max(glob(join(self.Dir, '*.log')), default=None)
+
+    def open(self, filename, offset=0, at_end=False):
+        if filename is None:
+            return
+        if self.File is not None:
+            self.File.close()
+        self.FileName = filename
+        self.File = open(filename, 'rb')
+        self.File.seek(0, 2) if at_end else self.File.seek(offset)
+        self.Midnight = get_midnight(Logger.get_file_date(filename))
+        self.Buffer = b''
+        if isinstance(self.Watcher, PollWatcher):
+            self.Watcher.FileName = filename
+
+    def read(self):
+        """:returns: measurements and events of all complete lines that were appended to the current file."""
+        self.Buffer += self.File.read()
+        data, events, n = parse_buffer(self.Buffer, self.Midnight)
+        self.Buffer = self.Buffer[n:]
+        return data, events
+
+    def poll(self):
+        """:returns: measurements and events since the last poll."""
+        if self.Watcher is None:
+            if not isdir(self.Dir):
+                return parse_logs([])
+            self.Watcher = make_watcher(self.Dir)
+        if not self.Watcher.changed() and self.File is not None and not self.Pending:
+            return parse_logs([])
+        self.Pending = False
+        records = [self.read()] if self.File is not None else []
+        latest = self.find_latest()
+        if latest is not None and latest != self.FileName:  # new day -> new file
+            if self.Buffer:
+                warning('Discarding incomplete line of {}: {}'.format(self.FileName, self.Buffer))
+            self.open(latest)
+            records.append(self.read())
+        if not records:
+            return parse_logs([])
+        data, events = zip(*records)
+        return concatenate(data), concatenate(events)
+
+    def close(self):
+        if self.File is not None:
+            self.File.close()
+        if self.Watcher is not None:
+            self.Watcher.close()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Sparse time index for the text logs of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from os.path import getsize, splitext, isfile
+from struct import Struct
+from numpy import dtype, fromfile
+
+
+IndexType = dtype([('time', '<f8'), ('offset', '<i8')])
+Entry = Struct('<dq')
+
+
+class LogIndex:
+    """Sidecar file next to a text log which maps the time to the byte offset of a line. An entry is only written every [step] seconds, so the index stays tiny."""
+
+    Ext = '.idx'
+
+    def __init__(self, log_file, step=60):
+        self.FileName = self.make_file_name(log_file)
+        self.File = open(self.FileName, 'ab')
+        self.Step = step
+        self.LastTime = -step
+
+    @staticmethod
+    def make_file_name(log_file):
+        return '{}{}'.format(splitext(log_file)[0], LogIndex.Ext)
+
+    def add(self, t, offset):
+        """Add an entry for the line starting at [offset] if the last entry is older than the step size."""
+        if t - self.LastTime >= self.Step:
+            self.File.write(Entry.pack(t, offset))
+            self.LastTime = t
+
+    def close(self):
+        self.File.close()
+
+
+def load_log_index(log_file):
+    filename = LogIndex.make_file_name(log_file)
+    return fromfile(filename, IndexType, count=getsize(filename) // IndexType.itemsize) if isfile(filename) else None
+
+
+def find_offset(log_file, t):
+    """:returns: byte offset of the last indexed line before the epoch time [t] (0 if there is no index)."""
+    index = load_log_index(log_file)
+    if index is None or not index.size:
+        return 0
+    i = index['time'].searchsorted(t, side='right') - 1
+    return int(index['offset'][i]) if i >= 0 else 0
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Vectorised parser for the text logs of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from numpy import dtype, frombuffer, flatnonzero, arange, zeros, append, array, concatenate, ascontiguousarray, nan
+from HVClient.src.logger import Logger
+from HVClient.src.log_index import find_offset
+from HVClient.src.utils import isfloat
+
+DataType = dtype([('time', '<f8'), ('bias', '<f8'), ('current', '<f8')])
+EventType = dtype([('time', '<f8'), ('name', 'U20'), ('value', '<f8')])
+
+# fixed layout of a measurement line: 'hh:mm:ss {v:10.3e} {c:10.3e}\t<dut>'
+TimeCols = [0, 1, 3, 4, 6, 7]
+BiasCols = arange(9, 19)
+CurrentCols = arange(20, 30)
+LineLength = 30
+
+
+def get_midnight(day):
+    return day.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def parse_log(filename, offset=0):
+    """:returns: measurements and events of the log file [filename] starting from the byte [offset]."""
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        return parse_buffer(f.read(), get_midnight(Logger.get_file_date(filename)))[:2]
+
+
+def parse_logs(files, start=0):
+    """:returns: measurements and events of the log [files] (sorted in time) after the epoch time [start]."""
+    if not files:
+        return zeros(0, DataType), zeros(0, EventType)
+    data, events = zip(*[parse_log(f, find_offset(f, start)) for f in files])
+    data, events = concatenate(data), concatenate(events)
+    return data[data['time'] > start], events[events['time'] > start]
+
+
+def parse_buffer(raw, midnight):
+    """ Convert all complete lines of the log file content [raw] in one pass.
+        :returns: measurements, events and the number of bytes that were consumed (an incomplete last line is left over) """
+    n = len(raw)
+    buf = frombuffer(raw + b'\n' * LineLength, 'u1')  # padding so that the fixed columns can be looked up for every line
+    ends = flatnonzero(buf[:n] == 10)
+    if not ends.size:
+        return zeros(0, DataType), zeros(0, EventType), 0
+    starts, consumed = append(0, ends[:-1] + 1), int(ends[-1]) + 1
+    good = (ends - starts > 9) & (buf[starts + 2] == 58) & (buf[starts + 5] == 58)  # hh:mm:ss
+    starts, ends = starts[good], ends[good]
+    pos = lambda cols: buf[starts[:, None] + cols]  # noqa
+    digits = pos(TimeCols).astype('i8') - 48
+    t = midnight + (digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 2] * 10 + digits[:, 3]) * 60 + digits[:, 4] * 10 + digits[:, 5]
+    is_event = (buf[starts + 9] >= 65) & (buf[starts + 9] <= 90)  # events start with capital letters
+    is_data = ~is_event & (ends - starts >= LineLength) & (buf[starts + 8] == 32) & (buf[starts + 19] == 32) & ((buf[starts + 30] == 9) | (buf[starts + 30] == 10))
+    data = zeros(is_data.sum(), DataType)
+    data['time'] = t[is_data]
+    data['bias'] = to_float(pos(BiasCols)[is_data])
+    data['current'] = to_float(pos(CurrentCols)[is_data])
+    others = flatnonzero(~is_data)
+    events = [e for e in (parse_event(raw[starts[i]:ends[i]], t[i]) for i in others[is_event[others]]) if e is not None]
+    rest = [d for d in (parse_data(raw[starts[i]:ends[i]], t[i]) for i in others[~is_event[others]]) if d is not None]
+    if rest:  # lines which do not fit the fixed layout
+        data = concatenate([data, array(rest, DataType)])
+        data.sort(order='time', kind='stable')
+    return data, array(events, EventType), consumed
+
+
+def to_float(columns):
+    return ascontiguousarray(columns).view('S{}'.format(columns.shape[1])).ravel().astype('d') if columns.size else zeros(0)
+
+
+def parse_event(line, t):
+    text = line.decode(errors='replace').split('\t')[0][9:]
+    name = text.split()[0].rstrip('0123456789.-')  # 'TARGET_BIAS' is written without separator
+    value = text[len(name):].strip()
+    return t, name, float(value) if isfloat(value) else nan
+
+
+def parse_data(line, t):
+    words = line.decode(errors='replace').split()
+    if len(words) > 2 and isfloat(words[1]) and isfloat(words[2]):
+        return t, float(words[1]), float(words[2])
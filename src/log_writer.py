@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Background thread writing the logs of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from threading import Thread, Lock
+from queue import Queue, Empty, Full
+from collections import OrderedDict
+from atexit import register
+from time import time
+from HVClient.src.utils import warning
+
+
+class LogWriter(Thread):
+    """ Single thread which writes the entries of all loggers. The acquisition threads only put the entries into a bounded queue,
+        so slow disks never stall the readout. The entries are written in batches every [flush_interval] seconds. """
+
+    Instance = None
+    InstanceLock = Lock()
+
+    def __init__(self, flush_interval=1., fsync_interval=0., queue_size=10000):
+        Thread.__init__(self, name='LogWriter', daemon=True)
+        self.Queue = Queue(queue_size)
+        self.FlushInterval = flush_interval
+        self.FSyncInterval = fsync_interval  # 0 = leave it to the OS
+        self.LastFSync = time()
+        self.NDropped = 0
+        self.IsKilled = False
+
+    @staticmethod
+    def get(config):
+        """:returns: the shared writer thread configured in the [Data] section of the [config]."""
+        with LogWriter.InstanceLock:
+            if LogWriter.Instance is None:
+                LogWriter.Instance = LogWriter(config.get_value('flush interval', float, 'Data', default=1.),
+                                               config.get_value('fsync interval', float, 'Data', default=0.),
+                                               config.get_value('queue size', int, 'Data', default=10000))
+                LogWriter.Instance.start()
+                register(LogWriter.Instance.stop)
+            return LogWriter.Instance
+
+    def put(self, logger, entry):
+        try:
+            self.Queue.put_nowait((logger, entry))
+        except Full:
+            self.NDropped += 1
+            if self.NDropped % 1000 == 1:
+                warning('Log queue is full, dropped {} entries so far'.format(self.NDropped))
+
+    def get_queue_depth(self):
+        return self.Queue.qsize()
+
+    def run(self):
+        while not self.IsKilled:
+            self.write_batch(self.collect())
+        self.write_batch(self.collect(0))  # drain the queue
+
+    def collect(self, timeout=None):
+        """:returns: all entries which arrive within the flush interval, grouped by logger."""
+        batch = OrderedDict()
+        deadline = time() + (self.FlushInterval if timeout is None else timeout)
+        while True:
+            try:
+                logger, entry = self.Queue.get(timeout=max(0, deadline - time()))
+            except Empty:
+                return batch
+            if logger is None:  # stop signal
+                return batch
+            batch.setdefault(logger, []).append(entry)
+
+    def write_batch(self, batch):
+        fsync = self.FSyncInterval > 0 and time() - self.LastFSync > self.FSyncInterval
+        for logger, entries in batch.items():
+            try:
+                with logger.Lock:  # the logger may be closed meanwhile
+                    if logger.File is None:
+                        continue
+                    logger.write_entries(entries)
+                    logger.flush(fsync)
+            except Exception as err:
+                warning('Could not write {} log entries of {} CH{}: {}'.format(len(entries), logger.Name, logger.Channel, err))
+        if fsync:
+            self.LastFSync = time()
+
+    def stop(self):
+        if self.is_alive():
+            self.IsKilled = True
+            self.Queue.put((None, None))
+            self.join()
@@ -6,10 +6,15 @@
 # --------------------------------------------------------
 
 
-from logging import getLogger, FileHandler, INFO, Formatter
-from os.path import join, realpath, dirname, basename
+from os import fsync
+from threading import Lock
+from os.path import join, realpath, dirname, basename, splitext
 from HVClient.src.utils import ensure_dir, info, load_config, message
-from time import strftime
+from HVClient.src.binary_log import BinaryLog
+from HVClient.src.log_index import LogIndex
+from HVClient.src.rollup import RollupLog
+from HVClient.src.log_writer import LogWriter
+from time import strftime, time, localtime
 from glob import glob
 from datetime import datetime
 
@@ -25,8 +30,11 @@ class Logger:
 
         self.Name = config.Section
         self.Channel = channel
-        self.Logger = getLogger('{}_CH{}'.format(self.Name, channel))
-        self.FileHandler = None
+        self.File = None
+        self.BinaryLog = None
+        self.Index = None
+        self.RollupLog = None
+        self.Lock = Lock()
 
         # Config
         self.DeviceName = config.get_value('name')
@@ -36,6 +44,10 @@ class Logger:
         # Directories
         self.LoggingDir = join(self.Dir, 'data', config.get('Data', 'directory'))
         self.LogFileDir = join(self.LoggingDir, '{}_CH{}'.format(self.DeviceName, self.Channel))
+        self.Binary = config.getboolean('Data', 'binary', fallback=False)
+        self.Rollup = config.getboolean('Data', 'rollup', fallback=False)
+        self.IndexStep = config.get_value('index step', float, 'Data', default=60)
+        self.Writer = LogWriter.get(config) if on and config.getboolean('Data', 'async', fallback=False) else None
 
         # Info fields
         self.LastStatus = None
@@ -45,57 +57,114 @@ class Logger:
         if on:
             self.configure()
 
-    def configure(self):
+    def configure(self, t=None):
         # check if directories exist and create them if not
         ensure_dir(self.LoggingDir)
         ensure_dir(self.LogFileDir)
-        self.Logger.removeHandler(self.FileHandler)
-        self.FileHandler = FileHandler(self.get_log_file())
-        self.FileHandler.setLevel(INFO)
-        self.FileHandler.setFormatter(Formatter('%(asctime)s %(message)s', '%H:%M:%S'))
-        self.Logger.addHandler(self.FileHandler)
+        log_file = self.get_log_file(t=t)
+        if self.File is not None:
+            self.File.close()
+        self.File = open(log_file, 'ab')
+        if self.Index is not None:
+            self.Index.close()
+        self.Index = LogIndex(log_file, self.IndexStep)
+        if self.Binary:
+            if self.BinaryLog is not None:
+                self.BinaryLog.close()
+            self.BinaryLog = BinaryLog(log_file)
+        if self.Rollup:
+            if self.RollupLog is not None:
+                self.RollupLog.close()
+            self.RollupLog = RollupLog(log_file)
 
     def get_dut_name(self):
         return self.Config.get_strings('dut name')[self.Channel]
 
-    def get_log_file(self, prnt=True):
-        """Check if there is already an existing log file for this day, otherwise create a new one."""
+    def get_log_file(self, prnt=True, t=None):
+        """Check if there is already an existing log file for this day, otherwise create a new one named after the epoch time [t] of its first entry (default: now)."""
         last_file = max(glob(join(self.LogFileDir, '*.log')), default='')
         if last_file and datetime.strptime(basename(last_file).split(self.ModelName)[-1].strip('.log_'), self.TimeFormat).day == int(self.Day):
             message('Reading old LOGFILE: {}'.format(last_file), prnt=prnt)
             return last_file
-        file_path = join(self.LogFileDir, '{hv}_{dev}_{mod}_{t}.log'.format(hv=self.Name, dev=self.DeviceName, mod=self.ModelName, t=strftime(self.TimeFormat)))
+        file_path = join(self.LogFileDir, '{hv}_{dev}_{mod}_{t}.log'.format(hv=self.Name, dev=self.DeviceName, mod=self.ModelName, t=strftime(self.TimeFormat, localtime(t))))
         message('Creating new LOGFILE: {}'.format(file_path), prnt=prnt)
         return file_path
 
-    def create_new_log_file(self):
-        self.configure()
+    @staticmethod
+    def get_file_date(filename):
+        return datetime.strptime('-'.join(splitext(basename(filename))[0].split('_')[-6:]), '%Y-%m-%d-%H-%M-%S')
 
-    def add_entry(self, txt, prnt=False):
+    def create_new_log_file(self, t=None):
+        self.configure(t)
+
+    def add_entry(self, txt, prnt=False, t=None, record=None):
         if prnt:
             info('{}\t{}\tCH{}'.format(txt, self.DeviceName, self.Channel))
-        self.Logger.warning('{}\t{}'.format(txt, self.get_dut_name()))
+        self.write(time() if t is None else t, '{}\t{}'.format(txt, self.get_dut_name()), record)
 
-    def write_log(self, status, bias, current, is_ramping, target_bias, prnt=False):
-        if strftime('%d') != self.Day:
-            self.create_new_log_file()
+    def write(self, t, txt=None, record=None):
+        """Hand the text line and the binary record to the log writer thread or write them directly if there is none."""
+        if self.File is None:  # logger is off
+            return
+        if self.Writer is not None:
+            self.Writer.put(self, (t, txt, record))
+        else:
+            with self.Lock:
+                self.write_entries([(t, txt, record)])
+                self.flush()
+
+    def write_entries(self, entries):
+        for t, txt, record in entries:
+            day = strftime('%d', localtime(t))
+            if day != self.Day:
+                self.Day = day
+                self.create_new_log_file(t)
+            if record is not None and self.BinaryLog is not None:
+                self.BinaryLog.write(*record)
+            if record is not None and self.RollupLog is not None and record[3]:  # only measurements when the device is ON, like in the text logs
+                self.RollupLog.add(*record[:3])
+            if txt is not None:
+                self.Index.add(t, self.File.tell())
+                self.File.write('{} {}\n'.format(strftime('%H:%M:%S', localtime(t)), txt).encode())
+
+    def flush(self, sync=False):
+        for f in [self.File, self.Index.File] + ([self.BinaryLog.File] if self.BinaryLog is not None else []) + (self.RollupLog.files if self.RollupLog is not None else []):
+            f.flush()
+            if sync:
+                fsync(f.fileno())
+
+    def close(self):
+        """Write the pending entries and close all files, the logger is off afterwards."""
+        with self.Lock:
+            if self.File is None:
+                return
+            self.flush(sync=True)
+            for log in [self.File, self.Index, self.BinaryLog, self.RollupLog]:
+                if log is not None:
+                    log.close()
+            self.File, self.Index, self.BinaryLog, self.RollupLog = None, None, None, None
+
+    def write_log(self, status, bias, current, is_ramping, target_bias, prnt=False, t=None):
+        t = time() if t is None else t
         if status != self.LastStatus and self.LastStatus is not None:
             info('writing log on/off')
-            self.add_entry('DEVICE_{}'.format('ON' if status else 'OFF'), prnt=prnt)
+            self.add_entry('DEVICE_{}'.format('ON' if status else 'OFF'), prnt=prnt, t=t)
         self.LastStatus = status
+        record = (t, bias, current, status, is_ramping) if self.Binary or self.Rollup else None
         # only write measurements when device is ON
         if not status:
+            if self.Binary:
+                self.write(t, record=record)
             return
-        self.add_entry('{v:10.3e} {c:10.3e}'.format(v=bias, c=current), prnt=prnt)
+        self.add_entry('{v:10.3e} {c:10.3e}'.format(v=bias, c=current), prnt=prnt, t=t, record=record)
         # write when ramping starts
         if is_ramping and not self.WasRamping:
-            self.add_entry('START_RAMPING_AT {0:7.1f}'.format(bias), prnt=prnt)
-            self.add_entry('TARGET_BIAS' + '{0:7.1f}'.format(target_bias), prnt=prnt)
+            self.add_entry('START_RAMPING_AT {0:7.1f}'.format(bias), prnt=prnt, t=t)
+            self.add_entry('TARGET_BIAS' + '{0:7.1f}'.format(target_bias), prnt=prnt, t=t)
         # write when ramping stops
         if self.WasRamping and not is_ramping:
-            self.add_entry('FINISH_RAMPING_AT {0:7.1f}'.format(bias), prnt=prnt)
+            self.add_entry('FINISH_RAMPING_AT {0:7.1f}'.format(bias), prnt=prnt, t=t)
         self.WasRamping = is_ramping
-        self.Day = strftime('%d')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Instrumentation endpoint of the High Voltage Client (Prometheus text format or json over http on localhost)
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from collections import OrderedDict
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from json import dumps
+from socketserver import ThreadingMixIn
+from threading import Thread, Event
+from time import time
+from HVClient.src.histogram import Histogram
+from HVClient.src.log_writer import LogWriter
+from HVClient.src.publisher import Publisher
+from HVClient.src.utils import info, warning
+
+DefaultPort = 9190
+
+
+def get_metrics(devices):
+    """:returns: metric name -> (type, help, list of (labels, value)) of the [devices], the value of histograms is a Histogram."""
+    metrics = OrderedDict()
+
+    def add(name, kind, doc, labels, value):
+        metrics.setdefault(name, (kind, doc, []))[2].append((labels, value))
+
+    for dev in devices:
+        labels = OrderedDict([('device', dev.Config.Section), ('model', str(dev.Config.get_value('model')))])
+        add('hv_readings_total', 'counter', 'number of measurements', labels, dev.NReadings)
+        add('hv_read_failures_total', 'counter', 'failed updates of the voltages and currents', labels, dev.NReadFailures)
+        add('hv_last_update_age_seconds', 'gauge', 'time since the last measurement', labels, time() - dev.get_last_update())
+        p = dev.Scheduler
+        add('hv_poll_cycle_seconds', 'histogram', 'time spent in the I/O of a poll cycle', labels, p.BusyHistogram)
+        add('hv_poll_period_seconds', 'gauge', 'mean achieved poll period', labels, p.MeanPeriod)
+        add('hv_poll_target_seconds', 'gauge', 'target poll period', labels, p.Target)
+        add('hv_poll_overruns_total', 'counter', 'poll cycles which took longer than the target period', labels, p.NOverruns)
+        lock = dev.IOLock
+        add('hv_lock_acquired_total', 'counter', 'transactions with the device', labels, lock.NAcquired)
+        add('hv_lock_contended_total', 'counter', 'transactions which had to wait for another thread', labels, lock.NContended)
+        add('hv_lock_timeouts_total', 'counter', 'transactions which gave up waiting for the device', labels, lock.NTimeouts)
+        add('hv_lock_wait_seconds', 'histogram', 'time waited for the device', labels, lock.WaitHistogram)
+        if dev.Timing is not None:
+            for query, h in sorted(list(dev.Timing.Histograms.items())):
+                add('hv_query_latency_seconds', 'histogram', 'time from sending a query to its answer', OrderedDict(labels, query=query), h)
+            add('hv_command_gap_seconds', 'gauge', 'learned minimum gap between two commands', labels, dev.Timing.Gap)
+        if hasattr(dev, 'NStatusRetries'):
+            add('hv_status_retries_total', 'counter', 'retries of the channel status query', labels, dev.NStatusRetries)
+            add('hv_poll_failures', 'gauge', 'combined poll queries which failed in a row', labels, dev.NPollFailures)
+    writer = LogWriter.Instance
+    if writer is not None:
+        add('hv_log_queue_depth', 'gauge', 'log entries waiting to be written', {}, writer.get_queue_depth())
+        add('hv_log_dropped_total', 'counter', 'log entries dropped because the queue was full', {}, writer.NDropped)
+    if Publisher.Instance:
+        add('hv_live_dropped_total', 'counter', 'live messages dropped for slow subscribers', {}, Publisher.Instance.NDropped)
+    return metrics
+
+
+def format_labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    return '{{{}}}'.format(','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in items)) if items else ''
+
+
+def to_prometheus(metrics):
+    """:returns: the [metrics] in the Prometheus text exposition format."""
+    lines = []
+    for name, (kind, doc, samples) in metrics.items():
+        lines += ['# HELP {} {}'.format(name, doc), '# TYPE {} {}'.format(name, kind)]
+        for labels, value in samples:
+            if isinstance(value, Histogram):
+                lines += ['{}_bucket{} {}'.format(name, format_labels(labels, le='{:g}'.format(le) if le != float('inf') else '+Inf'), n) for le, n in value.get_buckets()]
+                lines += ['{}_sum{} {!r}'.format(name, format_labels(labels), value.Sum), '{}_count{} {}'.format(name, format_labels(labels), value.N)]
+            else:
+                lines.append('{}{} {!r}'.format(name, format_labels(labels), value))
+    return '\n'.join(lines) + '\n'
+
+
+def to_json(metrics):
+    """:returns: the [metrics] per device as json, histograms are reduced to their count, mean, median and 99% quantile."""
+    data = OrderedDict()
+    for name, (kind, doc, samples) in metrics.items():
+        for labels, value in samples:
+            entry = data.setdefault(labels.get('device', 'global'), OrderedDict())
+            value = value.get_stats() if isinstance(value, Histogram) else value
+            if 'query' in labels:
+                entry.setdefault(name, OrderedDict())[labels['query']] = value
+            else:
+                entry[name] = value
+    return dumps(data, indent=2)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """ GET /metrics: Prometheus text format, GET /metrics.json: json. """
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path not in ['/metrics', '/metrics.json']:
+            return self.send_error(404, 'use /metrics or /metrics.json')
+        metrics = get_metrics(self.server.Devices)
+        body = (to_json(metrics) if path.endswith('.json') else to_prometheus(metrics)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json' if path.endswith('.json') else 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # no line per scrape
+
+
+class Metrics:
+    """ Serves the instrumentation of the running [devices] via http on [host]:[port] (no server if [port] is None) and prints a summary line per device
+        every [summary_interval] seconds (never if it is 0), so degraded serial links and saturated threads show up before the readings stop. """
+
+    def __init__(self, devices, host='127.0.0.1', port=DefaultPort, summary_interval=60.):
+        self.Devices = devices
+        self.SummaryInterval = summary_interval
+        self.Stopped = Event()
+        self.Server = None
+        if port is not None:
+            self.Server = ThreadingHTTPServer((host, port), RequestHandler)
+            self.Server.Devices = devices
+            Thread(target=self.Server.serve_forever, name='MetricsServer', daemon=True).start()
+            info('Serving the metrics on http://{}:{}/metrics'.format(host, self.Server.server_address[1]))
+        if summary_interval > 0:
+            Thread(target=self.run_summary, name='MetricsSummary', daemon=True).start()
+
+    def run_summary(self):
+        last = {dev: (time(), dev.NReadings, dev.NReadFailures) for dev in self.Devices}
+        while not self.Stopped.wait(self.SummaryInterval):
+            for dev in self.Devices:
+                info(self.get_summary(dev, *last[dev]))
+                last[dev] = (time(), dev.NReadings, dev.NReadFailures)
+            if LogWriter.Instance is not None:
+                info('log queue {} ({} dropped)'.format(LogWriter.Instance.get_queue_depth(), LogWriter.Instance.NDropped))
+
+    @staticmethod
+    def get_summary(dev, t, n_readings, n_failures):
+        """:returns: one line with the rates since the epoch time [t] and the latency quantiles of the [dev]."""
+        dt = max(time() - t, 1e-9)
+        queries = Histogram()
+        for h in (list(dev.Timing.Histograms.values()) if dev.Timing is not None else []):
+            queries.merge(h)
+        return '{} {}: {:.1f} readings/s, {} failures, busy {:.0f} ms (p99 {:.0f} ms) per {:.0f} ms cycle, query p99 {:.0f} ms, lock wait p99 {:.0f} ms, last update {:.1f} s ago'.format(
+            dev.Config.Section, dev.Config.get_value('model'), (dev.NReadings - n_readings) / dt, dev.NReadFailures - n_failures, 1000 * dev.Scheduler.BusyHistogram.quantile(.5),
+            1000 * dev.Scheduler.BusyHistogram.quantile(.99), 1000 * dev.Scheduler.Target, 1000 * queries.quantile(.99), 1000 * dev.IOLock.WaitHistogram.quantile(.99),
+            time() - dev.get_last_update())
+
+    def close(self):
+        self.Stopped.set()
+        if self.Server is not None:
+            self.Server.shutdown()
+            self.Server.server_close()
+
+
+def start_metrics(config, devices):
+    """:returns: the Metrics of the [devices] as configured in the [Metrics] section of the [config] (None if neither the server nor the summary is enabled)."""
+    serve = config.getboolean('Metrics', 'serve', fallback=False)
+    interval = config.get_value('summary interval', float, 'Metrics', default=60.)
+    if not serve and interval <= 0:
+        return None
+    try:
+        return Metrics(devices, config.get_value('host', section='Metrics', default='127.0.0.1'), config.get_value('port', int, 'Metrics', default=DefaultPort) if serve else None, interval)
+    except OSError as err:
+        warning('Could not start the metrics server: {}'.format(err))
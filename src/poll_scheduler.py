@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Deadline based poll scheduler of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from time import perf_counter
+from HVClient.src.histogram import Histogram
+
+
+class PollScheduler:
+    """ Keeps the poll cycles of a device on a fixed grid of deadlines, so the time spent in I/O is not added to the period.
+        If a cycle takes longer than the period the next one starts immediately (no catching up with a burst) and it is counted as overrun.
+        The achieved period, the jitter (rms deviation from the target period) and the busy time per cycle are recorded. """
+
+    def __init__(self):
+        self.Deadline = None
+        self.Target = 0.
+        self.Start = None
+        self.NOverruns = 0
+
+        # running statistics (Welford)
+        self.N = 0
+        self.MeanPeriod = 0.
+        self.M2Period = 0.
+        self.JitterSum = 0.
+        self.MaxPeriod = 0.
+        self.BusyTime = 0.
+        self.NBusy = 0
+        self.BusyHistogram = Histogram()
+
+    def get_delay(self, period):
+        """:returns: time in seconds until the next cycle with the target [period] is due."""
+        now = perf_counter()
+        self.Target = period
+        self.Deadline = now if self.Deadline is None else self.Deadline + period
+        if self.Deadline < now:
+            self.NOverruns += 1
+            self.Deadline = now
+        return self.Deadline - now
+
+    def start(self):
+        """Mark the beginning of a poll cycle."""
+        now = perf_counter()
+        if self.Start is not None:
+            period = now - self.Start
+            self.N += 1
+            delta = period - self.MeanPeriod
+            self.MeanPeriod += delta / self.N
+            self.M2Period += delta * (period - self.MeanPeriod)
+            self.JitterSum += (period - self.Target) ** 2
+            self.MaxPeriod = max(self.MaxPeriod, period)
+        self.Start = now
+
+    def done(self):
+        """Mark the end of the I/O of a poll cycle."""
+        if self.Start is not None:
+            busy = perf_counter() - self.Start
+            self.BusyTime += busy
+            self.NBusy += 1
+            self.BusyHistogram.add(busy)
+
+    def reset(self):
+        self.__init__()
+
+    def get_stats(self):
+        """:returns: target and achieved period, its standard deviation, the jitter, the longest period, the mean busy time per cycle and the number of overruns."""
+        return {'target': self.Target, 'period': self.MeanPeriod, 'std': (self.M2Period / self.N) ** .5 if self.N else 0.,
+                'jitter': (self.JitterSum / self.N) ** .5 if self.N else 0., 'max period': self.MaxPeriod,
+                'busy': self.BusyTime / self.NBusy if self.NBusy else 0., 'cycles': self.N, 'overruns': self.NOverruns,
+                'keeping up': self.NOverruns <= .05 * self.N}
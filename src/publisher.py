@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Live publish/subscribe of the readings of the High Voltage Client (Unix socket + shared memory)
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import socket
+from atexit import register
+from mmap import mmap, PROT_READ
+from os import getpid, unlink, kill
+from os.path import join, dirname, realpath, exists, isdir
+from struct import Struct
+from threading import Thread, Lock
+from time import time
+from numpy import dtype, frombuffer
+from HVClient.src.utils import info, warning, ensure_dir
+
+Dir = dirname(dirname(realpath(__file__)))
+SHMDir = '/dev/shm' if isdir('/dev/shm') else join(Dir, 'data')
+
+LiveType = dtype([('time', '<f8'), ('device', '<u2'), ('channel', 'u1'), ('bias', '<f4'), ('current', '<f8'), ('status', 'u1'), ('ramping', 'u1')])
+Live = Struct('<dHBfdBB')  # same layout as LiveType, one record per measurement
+Header = Struct('<4sHHI')  # magic, version, number of slots, pid of the publisher
+Magic, Version = b'HVLV', 1
+SlotSize = 32  # sequence number (u4) + padding (u2) + record
+Seq = Struct('<I')
+MaxRecords = 2000  # records per socket message
+
+
+class Publisher:
+    """ Pushes every reading to the subscribers of a Unix domain socket (SOCK_SEQPACKET, one message = packed LiveType records) and keeps the latest
+        reading per channel in a shared memory file. The slots are updated with a sequence lock (odd while writing), so readers never block the acquisition.
+        A subscriber which does not keep up loses messages, it never stalls the publisher. """
+
+    Instance = None
+    InstanceLock = Lock()
+
+    def __init__(self, socket_file, shm_file, n_slots=64):
+        self.SocketFile = socket_file
+        self.SHMFile = shm_file
+        self.NSlots = n_slots
+        self.Slots = {}  # (device, channel) -> slot index
+        self.Subscribers = []
+        self.NDropped = 0
+        self.Lock = Lock()
+        self.IsKilled = False
+
+        self.Socket = self.init_socket()  # raises if another publisher is running, before its shared memory is touched
+        try:
+            self.SHM = self.init_shm()
+        except OSError:
+            self.Socket.close()
+            unlink(self.SocketFile)
+            raise
+        Thread(target=self.accept, name='Publisher', daemon=True).start()
+
+    @staticmethod
+    def get(config):
+        """:returns: the shared publisher if it is enabled in the [Live] section of the [config] (otherwise None)."""
+        if not config.getboolean('Live', 'publish', fallback=False):
+            return None
+        with Publisher.InstanceLock:
+            if Publisher.Instance is None:
+                socket_file = config.get_value('socket', section='Live', default=join(Dir, 'data', 'hv_live.sock'))
+                shm_file = config.get_value('shared memory', section='Live', default=join(SHMDir, 'hv_live'))
+                try:
+                    Publisher.Instance = Publisher(socket_file, shm_file, config.get_value('slots', int, 'Live', default=64))
+                    register(Publisher.Instance.close)
+                except OSError as err:
+                    warning('Could not start the live publisher: {}'.format(err))
+                    Publisher.Instance = False
+            return Publisher.Instance or None
+
+    # ----------------------------------------
+    # region INIT
+    def init_shm(self):
+        ensure_dir(dirname(self.SHMFile))
+        with open(self.SHMFile, 'w+b') as f:
+            f.truncate(Header.size + self.NSlots * SlotSize)
+            shm = mmap(f.fileno(), 0)
+        Header.pack_into(shm, 0, Magic, Version, self.NSlots, getpid())
+        return shm
+
+    def init_socket(self):
+        if exists(self.SocketFile):
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            try:
+                s.connect(self.SocketFile)
+                s.close()
+                raise OSError('another publisher is running on {}'.format(self.SocketFile))
+            except (ConnectionRefusedError, FileNotFoundError):
+                unlink(self.SocketFile)  # left over from a crash
+        ensure_dir(dirname(self.SocketFile))
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        s.bind(self.SocketFile)
+        s.listen(16)
+        info('Publishing the live readings on {}'.format(self.SocketFile))
+        return s
+
+    def accept(self):
+        while not self.IsKilled:
+            try:
+                conn, _ = self.Socket.accept()
+            except OSError:
+                return
+            conn.setblocking(False)
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)  # absorb short stalls of the subscriber
+            with self.Lock:
+                self.Subscribers.append(conn)
+    # endregion INIT
+    # ----------------------------------------
+
+    def publish(self, records):
+        """Send the list of [records] (tuples in the order of LiveType) to all subscribers and update the latest values."""
+        if not records:
+            return
+        with self.Lock:
+            for record in records:
+                self.write_slot(record)
+            for i in range(0, len(records), MaxRecords):
+                self.send(b''.join(Live.pack(*r) for r in records[i:i + MaxRecords]))
+
+    def write_slot(self, record):
+        key = record[1:3]
+        if key not in self.Slots:
+            if len(self.Slots) == self.NSlots:
+                return
+            self.Slots[key] = len(self.Slots)
+        pos = Header.size + self.Slots[key] * SlotSize
+        seq = Seq.unpack_from(self.SHM, pos)[0]
+        Seq.pack_into(self.SHM, pos, seq + 1)  # odd: writing
+        Live.pack_into(self.SHM, pos + 6, *record)
+        Seq.pack_into(self.SHM, pos, seq + 2)
+
+    def send(self, msg):
+        for conn in list(self.Subscribers):
+            try:
+                conn.send(msg)
+            except BlockingIOError:
+                self.NDropped += 1
+            except OSError:
+                conn.close()
+                self.Subscribers.remove(conn)
+
+    def get_stats(self):
+        return {'subscribers': len(self.Subscribers), 'channels': len(self.Slots), 'dropped': self.NDropped}
+
+    def close(self):
+        self.IsKilled = True
+        with self.Lock:
+            for conn in self.Subscribers:
+                conn.close()
+            self.Subscribers = []
+            Header.pack_into(self.SHM, 0, Magic, Version, self.NSlots, 0)  # pid 0: publisher stopped
+        try:
+            self.Socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.Socket.close()
+        if exists(self.SocketFile):
+            unlink(self.SocketFile)
+
+
+class Subscriber:
+    """ Receives the readings of a running Publisher. Iterating yields the records of one message as structured array (LiveType). """
+
+    def __init__(self, socket_file=join(Dir, 'data', 'hv_live.sock')):
+        self.Socket = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.Socket.connect(socket_file)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        msg = self.Socket.recv(MaxRecords * Live.size)
+        if not msg:
+            raise StopIteration
+        return frombuffer(msg, LiveType)
+
+    def receive(self, timeout=None):
+        """:returns: next message as structured array or None if there was none within [timeout] seconds."""
+        self.Socket.settimeout(timeout)
+        try:
+            return next(self)
+        except (socket.timeout, StopIteration):
+            return None
+
+    def close(self):
+        self.Socket.close()
+
+
+class LiveValues:
+    """ Read-only view of the latest reading per channel in the shared memory of a Publisher (no socket, no locks). """
+
+    def __init__(self, shm_file=join(SHMDir, 'hv_live')):
+        with open(shm_file, 'rb') as f:
+            self.SHM = mmap(f.fileno(), 0, prot=PROT_READ)
+        magic, version, self.NSlots, _ = Header.unpack_from(self.SHM, 0)
+        if magic != Magic or version != Version:
+            raise ValueError('{} is not a live value file of version {}'.format(shm_file, Version))
+
+    def is_alive(self):
+        pid = Header.unpack_from(self.SHM, 0)[3]
+        try:
+            return pid > 0 and kill(pid, 0) is None
+        except OSError:
+            return False
+
+    def read_slot(self, i):
+        """:returns: consistent copy of the record in slot [i] or None if it is empty."""
+        pos = Header.size + i * SlotSize
+        for _ in range(1000):  # the writer may have died while writing
+            seq = Seq.unpack_from(self.SHM, pos)[0]
+            if seq == 0:
+                return None
+            if seq % 2:
+                continue  # being written
+            record = Live.unpack_from(self.SHM, pos + 6)
+            if Seq.unpack_from(self.SHM, pos)[0] == seq:
+                return record
+
+    def read(self):
+        """:returns: latest reading of all channels as structured array (LiveType)."""
+        records = [r for r in (self.read_slot(i) for i in range(self.NSlots)) if r is not None]
+        return frombuffer(b''.join(Live.pack(*r) for r in records), LiveType)
+
+    def get(self, device, channel=0):
+        """:returns: latest reading (tuple in the order of LiveType) of the [channel] of HV[device] or None."""
+        return next((r for r in (self.read_slot(i) for i in range(self.NSlots)) if r is not None and r[1:3] == (device, channel)), None)
+
+    def get_age(self, device, channel=0):
+        r = self.get(device, channel)
+        return None if r is None else time() - r[0]
+
+    def close(self):
+        self.SHM.close()
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from datetime import datetime
+
+    parser = ArgumentParser(description='print the live readings of a running HV client/daemon')
+    parser.add_argument('socket', nargs='?', default=join(Dir, 'data', 'hv_live.sock'))
+    args = parser.parse_args()
+
+    for data in Subscriber(args.socket):
+        for r in data:
+            print('{} HV{} CH{} {:8.2f} V {:11.4e} A {}{}'.format(datetime.fromtimestamp(r['time']).strftime('%H:%M:%S.%f')[:-3], r['device'], r['channel'],
+                                                                 r['bias'], r['current'], 'ON' if r['status'] else 'OFF', ' ramping' if r['ramping'] else ''))
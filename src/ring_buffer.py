@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Fixed size buffer for the displayed data of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from numpy import zeros, arange, asarray
+
+
+class RingBuffer:
+    """ Preallocated buffer of the last [capacity] samples (time, voltage, current).
+        Every sample is stored twice (at i and i + capacity), so the newest n samples are always one contiguous slice and can be returned as views without copying. """
+
+    def __init__(self, capacity=2 ** 19):
+        self.Capacity = int(capacity)
+        self.Data = zeros((3, 2 * self.Capacity))
+        self.Head = 0  # position of the next sample
+        self.N = 0
+
+    def __len__(self):
+        return self.N
+
+    def append(self, t, v, c):
+        self.Data[:, [self.Head, self.Head + self.Capacity]] = [[t], [v], [c]]
+        self.Head = (self.Head + 1) % self.Capacity
+        self.N = min(self.N + 1, self.Capacity)
+
+    def extend(self, t, v, c):
+        values = asarray([t, v, c], 'd')[:, -self.Capacity:]
+        n = values.shape[1]
+        i = (self.Head + arange(n)) % self.Capacity
+        self.Data[:, i] = values
+        self.Data[:, i + self.Capacity] = values
+        self.Head = (self.Head + n) % self.Capacity
+        self.N = min(self.N + n, self.Capacity)
+
+    def get(self, n=None):
+        """:returns: views of the time, voltage and current of the last [n] samples (all if None)."""
+        n = self.N if n is None else min(n, self.N)
+        end = self.Head + self.Capacity
+        return self.Data[:, end - n:end]
+
+    def window(self, t_min):
+        """:returns: views of the time, voltage and current of all samples with time >= [t_min]."""
+        data = self.get()
+        return data[:, data[0].searchsorted(t_min):]
+
+    @property
+    def time(self):
+        return self.get()[0]
+
+    @property
+    def voltage(self):
+        return self.get()[1]
+
+    @property
+    def current(self):
+        return self.get()[2]
+
+    def last_time(self):
+        return self.Data[0, self.Head + self.Capacity - 1] if self.N else None
+
+    def clear(self):
+        self.Head = 0
+        self.N = 0
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Pre-aggregated rollups of the logs of the High Voltage Client
+# created on October 18th 2026
+# --------------------------------------------------------
+
+from collections import OrderedDict
+from glob import glob
+from os.path import getsize, splitext, isfile, join
+from struct import Struct
+from math import floor
+from numpy import dtype, fromfile, zeros, concatenate, append, flatnonzero, diff, minimum, maximum, add, floor as np_floor, column_stack
+
+
+Levels = OrderedDict([('10s', 10), ('1min', 60), ('10min', 600)])  # bucket width in seconds
+RollupType = dtype([('time', '<f8'), ('count', '<u4'),
+                    ('bias_min', '<f4'), ('bias_max', '<f4'), ('bias_mean', '<f4'), ('bias_last', '<f4'),
+                    ('current_min', '<f8'), ('current_max', '<f8'), ('current_mean', '<f8'), ('current_last', '<f8')])
+Row = Struct('<dIffffdddd')  # same layout as RollupType
+
+
+class Rollup:
+    """Aggregates (min, max, mean, last and count) of the bias and current in buckets of [width] seconds. A bucket is appended to the file as soon as the next one starts."""
+
+    Ext = '.roll'
+
+    def __init__(self, log_file, level):
+        self.FileName = self.make_file_name(log_file, level)
+        self.File = open(self.FileName, 'ab')
+        self.Width = Levels[level]
+        self.Bucket = None
+        self.Count = 0
+        self.Bias = [0, 0, 0, 0]  # min, max, sum, last
+        self.Current = [0, 0, 0, 0]
+
+    @staticmethod
+    def make_file_name(log_file, level):
+        return '{}.{}{}'.format(splitext(log_file)[0], level, Rollup.Ext)
+
+    def add(self, t, bias, current):
+        bucket = floor(t / self.Width) * self.Width
+        if bucket != self.Bucket:
+            self.write()
+            self.Bucket, self.Count, self.Bias, self.Current = bucket, 0, [bias, bias, 0, 0], [current, current, 0, 0]
+        self.Count += 1
+        for values, v in [(self.Bias, bias), (self.Current, current)]:
+            values[:] = min(values[0], v), max(values[1], v), values[2] + v, v
+
+    def write(self):
+        if self.Count:
+            b, c, n = self.Bias, self.Current, self.Count
+            self.File.write(Row.pack(self.Bucket, n, b[0], b[1], b[2] / n, b[3], c[0], c[1], c[2] / n, c[3]))
+            self.Count = 0
+
+    def close(self):
+        """Write the incomplete bucket, it gets merged with the rest of the bucket when the rollup is loaded."""
+        self.write()
+        self.File.close()
+
+
+class RollupLog:
+    """Rollups of all levels for one log file."""
+
+    def __init__(self, log_file):
+        self.Rollups = [Rollup(log_file, level) for level in Levels]
+
+    def add(self, t, bias, current):
+        for rollup in self.Rollups:
+            rollup.add(t, bias, current)
+
+    @property
+    def files(self):
+        return [rollup.File for rollup in self.Rollups]
+
+    def close(self):
+        for rollup in self.Rollups:
+            rollup.close()
+
+
+def aggregate(data, width):
+    """:returns: rollup of the structured array [data] with the fields time, bias and current."""
+    if not data.size:
+        return zeros(0, RollupType)
+    t = np_floor(data['time'] / width) * width
+    starts = append(0, flatnonzero(diff(t)) + 1)
+    rollup = zeros(starts.size, RollupType)
+    rollup['time'], rollup['count'] = t[starts], diff(append(starts, t.size))
+    for name in ['bias', 'current']:
+        v = data[name]
+        rollup['{}_min'.format(name)], rollup['{}_max'.format(name)] = minimum.reduceat(v, starts), maximum.reduceat(v, starts)
+        rollup['{}_mean'.format(name)] = add.reduceat(v, starts) / rollup['count']
+        rollup['{}_last'.format(name)] = v[append(starts[1:], t.size) - 1]
+    return rollup
+
+
+def merge(rollup):
+    """Combine consecutive rows of the same bucket (written when the logger was restarted within a bucket)."""
+    if rollup.size < 2 or (diff(rollup['time']) > 0).all():
+        return rollup
+    starts = append(0, flatnonzero(diff(rollup['time'])) + 1)
+    merged = rollup[starts].copy()
+    merged['count'] = add.reduceat(rollup['count'], starts)
+    for name in ['bias', 'current']:
+        merged['{}_min'.format(name)] = minimum.reduceat(rollup['{}_min'.format(name)], starts)
+        merged['{}_max'.format(name)] = maximum.reduceat(rollup['{}_max'.format(name)], starts)
+        merged['{}_mean'.format(name)] = add.reduceat(rollup['{}_mean'.format(name)] * rollup['count'], starts) / merged['count']
+        merged['{}_last'.format(name)] = rollup['{}_last'.format(name)][append(starts[1:], rollup.size) - 1]
+    return merged
+
+
+def load_rollup(log_file, level):
+    filename = Rollup.make_file_name(log_file, level)
+    return merge(fromfile(filename, RollupType, count=getsize(filename) // RollupType.itemsize)) if isfile(filename) else None
+
+
+def load_rollups(files, level, start=0):
+    """:returns: rollup of the [level] of all log [files] (sorted in time) after the epoch time [start] or None if a rollup file is missing."""
+    data = [load_rollup(f, level) for f in files]
+    if any(d is None for d in data):
+        return None
+    data = concatenate(data) if data else zeros(0, RollupType)
+    return data[data['time'] >= start]
+
+
+def select_level(span, min_points):
+    """:returns: the coarsest level which has at least [min_points] buckets in [span] seconds (None if the raw data is required)."""
+    return next((level for level, width in reversed(Levels.items()) if span / width >= min_points), None)
+
+
+def to_envelope(rollup, data_type):
+    """:returns: two samples (min and max) per bucket as structured array of [data_type], so that spikes are still visible in the plots."""
+    data = zeros(2 * rollup.size, data_type)
+    data['time'] = rollup['time'].repeat(2)
+    data['bias'] = column_stack([rollup['bias_min'], rollup['bias_max']]).ravel()
+    data['current'] = column_stack([rollup['current_min'], rollup['current_max']]).ravel()
+    return data
+
+
+def rebuild_rollups(log_dir):
+    """Create the rollups of all text logs in [log_dir] (overwrites existing rollups)."""
+    from HVClient.src.log_parser import parse_log
+    for log_file in sorted(glob(join(log_dir, '*.log'))):
+        data = parse_log(log_file)[0]
+        for level, width in Levels.items():
+            aggregate(data, width).tofile(Rollup.make_file_name(log_file, level))
+        print('Created rollups of {} ({} samples)'.format(log_file, data.size))
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='Rebuild the rollups from the text logs')
+    parser.add_argument('dirs', nargs='+', help='log directories of the channels, e.g. data/test/Keithley2400_CH0')
+    args = parser.parse_args()
+
+    for d in args.dirs:
+        rebuild_rollups(d)
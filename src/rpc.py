@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# --------------------------------------------------------
+#       Remote control of the running devices of the High Voltage Client (JSON lines over a Unix or TCP socket)
+# created on October 18th 2026
+# --------------------------------------------------------
+
+import socket
+from json import loads, dumps
+from os import unlink
+from os.path import join, dirname, realpath, exists
+from socketserver import ThreadingMixIn, UnixStreamServer, TCPServer, StreamRequestHandler
+from threading import Thread
+from HVClient.src.utils import info, warning, ensure_dir, ON
+
+Dir = dirname(dirname(realpath(__file__)))
+DefaultAddress = join(Dir, 'data', 'hv_rpc.sock')
+
+
+def parse_address(address):
+    """:returns: path of the Unix socket (relative paths are relative to the HVClient directory) or (host, port) for addresses of the form host:port."""
+    if ':' in address and '/' not in address:
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return join(Dir, address)
+
+
+class ThreadingUnixServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class ThreadingTCPServer(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RequestHandler(StreamRequestHandler):
+    """ One request per line: {"id": 1, "method": "set_target_bias", "params": {"device": 1, "channel": [0, 1], "bias": -100}}, a list of requests is a batch.
+        The requests of a connection are executed in order and every request gets a response with its id, so the clients can pipeline. """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = loads(line.decode())
+                response = [self.server.RPC.execute(r) for r in request] if isinstance(request, list) else self.server.RPC.execute(request)
+            except ValueError as err:
+                response = {'id': None, 'error': 'invalid request: {}'.format(err)}
+            self.wfile.write((dumps(response) + '\n').encode())
+
+
+class RPCServer:
+    """ Exposes the control functions and the state of the running [devices]. The channel parameter takes a single channel, a list of channels or null for all active
+        channels of the device. Turning a channel off ramps it down first (like the button in the GUI). """
+
+    Methods = ['get_devices', 'get_state', 'set_target_bias', 'power_down', 'set_output', 'set_ramp_speed']
+
+    def __init__(self, devices, address=DefaultAddress):
+        self.Devices = {dev.Number: dev for dev in devices}
+        self.Address = parse_address(address)
+        self.NRequests = 0
+        self.NErrors = 0
+        self.Server = self.init_server()
+        self.Server.RPC = self
+        Thread(target=self.Server.serve_forever, name='RPCServer', daemon=True).start()
+        info('RPC server listening on {}'.format(self.Address))
+
+    def init_server(self):
+        if isinstance(self.Address, tuple):
+            return ThreadingTCPServer(self.Address, RequestHandler)
+        if exists(self.Address):
+            unlink(self.Address)  # left over from a crash
+        ensure_dir(dirname(self.Address))
+        return ThreadingUnixServer(self.Address, RequestHandler)
+
+    def close(self):
+        self.Server.shutdown()
+        self.Server.server_close()
+        if not isinstance(self.Address, tuple) and exists(self.Address):
+            unlink(self.Address)
+
+    def execute(self, request):
+        """:returns: the response to a single [request]."""
+        self.NRequests += 1
+        rid = request.get('id') if isinstance(request, dict) else None
+        try:
+            method = request['method']
+            if method not in RPCServer.Methods:
+                raise ValueError('unknown method "{}", available: {}'.format(method, ', '.join(RPCServer.Methods)))
+            return {'id': rid, 'result': getattr(self, method)(**request.get('params', {}))}
+        except Exception as err:
+            self.NErrors += 1
+            return {'id': rid, 'error': '{}: {}'.format(type(err).__name__, err)}
+
+    def get_device(self, device):
+        if device not in self.Devices:
+            raise ValueError('unknown device {}, available: {}'.format(device, list(self.Devices)))
+        return self.Devices[device]
+
+    @staticmethod
+    def get_channels(dev, channel=None):
+        channels = dev.ActiveChannels if channel is None else channel if isinstance(channel, list) else [channel]
+        for ch in channels:
+            if ch not in dev.ActiveChannels:
+                raise ValueError('channel {} of HV{} is not active'.format(ch, dev.Number))
+        return channels
+
+    # ----------------------------------------
+    # region METHODS
+    def get_devices(self):
+        return {nr: {'name': dev.Config.get_value('name'), 'model': dev.Config.get_value('model'), 'channels': list(dev.ActiveChannels)} for nr, dev in self.Devices.items()}
+
+    def get_state(self, device=None, channel=None):
+        devices = self.Devices.values() if device is None else [self.get_device(device)]
+        return {dev.Number: {ch: dev.get_channel_state(ch) for ch in self.get_channels(dev, channel if device is not None else None)} for dev in devices}
+
+    def set_target_bias(self, device, bias, channel=None):
+        dev = self.get_device(device)
+        channels = self.get_channels(dev, channel)
+        for ch in channels:
+            if not dev.validate_voltage(bias, ch):
+                raise ValueError('{} V is beyond the maximum bias of HV{} CH{}'.format(bias, device, ch))
+        for ch in channels:
+            dev.set_target_bias(bias, ch)
+        return channels
+
+    def power_down(self, device, channel=None):
+        dev = self.get_device(device)
+        channels = self.get_channels(dev, channel)
+        for ch in channels:
+            dev.power_down(ch)
+        return channels
+
+    def set_output(self, device, status, channel=None):
+        dev = self.get_device(device)
+        channels = self.get_channels(dev, channel)
+        for ch in channels:
+            dev.set_output(ON, ch) if status else dev.power_down(ch)
+        return channels
+
+    def set_ramp_speed(self, device, speed, channel=None):
+        dev = self.get_device(device)
+        channels = self.get_channels(dev, channel)
+        for ch in channels:
+            dev.set_ramp_speed(float(speed), ch)
+        return channels
+    # endregion METHODS
+    # ----------------------------------------
+
+
+class RPCClient:
+    """ Client stub for the RPCServer. [call] waits for the result, [send] and [receive] pipeline requests and [batch] sends several requests in one message. """
+
+    def __init__(self, address=DefaultAddress, timeout=10):
+        address = parse_address(address)
+        self.Socket = socket.create_connection(address, timeout) if isinstance(address, tuple) else socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if not isinstance(address, tuple):
+            self.Socket.settimeout(timeout)
+            self.Socket.connect(address)
+        self.File = self.Socket.makefile('rb')
+        self.Id = 0
+        self.Pending = {}  # responses which arrived while waiting for another id
+
+    def __getattr__(self, method):
+        if method not in RPCServer.Methods:
+            raise AttributeError(method)
+        return lambda **params: self.call(method, **params)
+
+    def make_request(self, method, params):
+        self.Id += 1
+        return {'id': self.Id, 'method': method, 'params': params}
+
+    def write(self, msg):
+        self.Socket.sendall((dumps(msg) + '\n').encode())
+
+    def read(self):
+        line = self.File.readline()
+        if not line:
+            raise ConnectionError('RPC server closed the connection')
+        return loads(line.decode())
+
+    def send(self, method, **params):
+        """Send a request without waiting for the response. :returns: id of the request"""
+        request = self.make_request(method, params)
+        self.write(request)
+        return request['id']
+
+    def receive(self, rid):
+        """:returns: result of the request with the id [rid]. :raises: RuntimeError with the error message of the server"""
+        while rid not in self.Pending:
+            response = self.read()
+            self.Pending[response['id']] = response
+        return self.get_result(self.Pending.pop(rid))
+
+    @staticmethod
+    def get_result(response):
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def call(self, method, **params):
+        return self.receive(self.send(method, **params))
+
+    def batch(self, requests):
+        """Send the list of (method, params) [requests] in one message. :returns: list of the results (or RuntimeError instances for failed requests)"""
+        msg = [self.make_request(method, params) for method, params in requests]
+        self.write(msg)
+        responses = self.read()
+        while not isinstance(responses, list):  # response of an earlier pipelined request
+            self.Pending[responses['id']] = responses
+            responses = self.read()
+        return [RuntimeError(r['error']) if 'error' in r else r['result'] for r in responses]
+
+    def close(self):
+        self.File.close()
+        self.Socket.close()
+
+
+def start_server(config, devices):
+    """:returns: an RPCServer for the [devices] if it is enabled in the [RPC] section of the [config] (otherwise None)."""
+    if not config.getboolean('RPC', 'serve', fallback=False):
+        return None
+    try:
+        return RPCServer(devices, config.get_value('address', section='RPC', default=DefaultAddress))
+    except OSError as err:
+        warning('Could not start the RPC server: {}'.format(err))
@@ -73,7 +73,7 @@ def dir_exists(path):
 def ensure_dir(path):
     if not pth.exists(path):
         message('Creating directory: {d}'.format(d=path))
-        makedirs(path)
+        makedirs(path, exist_ok=True)  # may be created concurrently by another device
 
 
 def print_banner(msg, symbol='=', new_lines=True):